@@ -1,13 +1,69 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models.functions import Substr
 
 from .models import Category, Comment, Location, Post
+from .paginators import EstimatedCountPaginator
+from .search import get_search_index, search_terms
+
+PREVIEW_LENGTH = 80
+
+
+def preview(value):
+    """Начало текста для списка объектов, обрезанное по PREVIEW_LENGTH."""
+    if len(value) <= PREVIEW_LENGTH:
+        return value
+    return value[:PREVIEW_LENGTH].rstrip() + '…'
+
+
+class PreviewChangeList(ChangeList):
+    """Список, загружающий вместо полей preview_fields только их начало.
+
+    Текст обрезается в SQL: <поле>_preview содержит на символ больше
+    PREVIEW_LENGTH, чтобы preview() знал, нужно ли многоточие. Поля
+    deferred_fields, например тексты связанных объектов, не загружаются.
+    """
+
+    def get_queryset(self, request):
+        fields = self.model_admin.preview_fields
+        return super().get_queryset(request).defer(
+            *fields, *self.model_admin.deferred_fields
+        ).annotate(**{
+            f'{field}_preview': Substr(field, 1, PREVIEW_LENGTH + 1)
+            for field in fields
+        })
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Админка для больших таблиц.
+
+    Число строк оценивается без полного COUNT(*), длинные тексты
+    обрезаются в запросе, а связи выбираются полями raw_id/autocomplete
+    вместо выпадающих списков со всеми объектами. Сортировка по
+    первичному ключу читает страницу по индексу, без сортировки таблицы.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    preview_fields = ()
+    deferred_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return PreviewChangeList
+
+    @admin.display(description='Текст')
+    def text_preview(self, obj):
+        return preview(obj.text_preview)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'title',
-        'text',
+        'text_preview',
+        'author',
+        'category',
         'is_published',
         'created_at',
         'pub_date',
@@ -16,16 +72,42 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'pub_date'
     )
+    list_select_related = ('author', 'category')
+    preview_fields = ('text',)
+    autocomplete_fields = ('author', 'category', 'location')
     search_fields = ('title',)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по индексу полнотекстового поиска вместо LIKE '%…%'."""
+        terms = search_terms(search_term)
+        if not terms:
+            return queryset, False
+        return queryset.filter(
+            pk__in=get_search_index().matching(terms)
+        ), False
+
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = (
-        'text',
+        'text_preview',
+        'post',
+        'author',
         'created_at',
     )
+    list_select_related = ('post', 'author')
+    preview_fields = ('text',)
+    deferred_fields = ('post__text', 'post__excerpt')
+    raw_id_fields = ('post',)
+    autocomplete_fields = ('author',)
+    search_fields = ('=author__username',)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ('title',)
 
 
-admin.site.register(Category)
-admin.site.register(Location)
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
@@ -0,0 +1,350 @@
+import copy
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Count
+from django.template.base import Template
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from blog.mixins import NUM_POSTS
+from blog.models import Category, Comment, Post, User
+from blog.utils import NUM_COMMENTS, get_post_list, only_feed_fields
+from core.warmup import warm_templates
+
+PROJECTION_ROWS = 1000
+
+
+def measure(func, repeat, setup=None):
+    """Время выполнения func в миллисекундах для каждого из repeat запусков.
+
+    setup вызывается перед каждым запуском и в замер не входит.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def percentile(samples, percent):
+    """Перцентиль выборки методом ближайшего ранга."""
+    ordered = sorted(samples)
+    rank = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def format_samples(samples):
+    return (f'p50={percentile(samples, 50):.2f}ms '
+            f'p95={percentile(samples, 95):.2f}ms '
+            f'mean={statistics.mean(samples):.2f}ms')
+
+
+@contextmanager
+def without_indexes(model, names=None):
+    """Временно удаляет индексы модели и откатывает изменения на выходе.
+
+    Позволяет в одном прогоне сравнить планы запросов «до» и «после»
+    миграции с индексами; на бэкендах с транзакционным DDL (SQLite,
+    PostgreSQL) схема восстанавливается откатом транзакции.
+    """
+    indexes = [index for index in model._meta.indexes
+               if names is None or index.name in names]
+    editor = connection.schema_editor()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for index in indexes:
+            cursor.execute(str(index.remove_sql(model, editor)))
+        yield
+        transaction.set_rollback(True)
+
+
+def render_view(view, path='/', user=None, **kwargs):
+    """Выполняет view через RequestFactory и возвращает отрендеренный ответ."""
+    request = RequestFactory().get(path)
+    request.user = user or AnonymousUser()
+    response = view(request, **kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def seed_posts(total):
+    """Досоздаёт синтетические посты, пока их не станет не меньше total."""
+    missing = total - Post.objects.count()
+    if missing > 0:
+        call_command('seed_blog', users=0 if User.objects.exists() else 10,
+                     posts=missing, comments=0)
+    return max(missing, 0)
+
+
+def seed_comments(total, batch_size=5000):
+    """Видимый пост, у которого не меньше total комментариев."""
+    seed_posts(100)
+    post = get_post_list().order_by('-comment_count').first()
+    missing = total - post.comments.count()
+    authors = list(User.objects.values_list('pk', flat=True)[:100])
+    for start in range(0, max(missing, 0), batch_size):
+        Comment.objects.bulk_create(
+            Comment(post=post, author_id=authors[i % len(authors)],
+                    text=f'Комментарий {i}')
+            for i in range(start, min(start + batch_size, missing))
+        )
+    if missing > 0:
+        Post.objects.filter(pk=post.pk).update(
+            comment_count=post.comments.count())
+    return post
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def bench_feed(stdout, repeat, posts, **options):
+    """План запроса и время ответа PostListView без индексов и с ними.
+
+    Страница рендерится для анонимного читателя, поэтому кэши очищаются
+    перед каждым замером: иначе все замеры после первого отдаются из
+    полностраничного кэша и не зависят от индексов.
+    """
+    from blog.views import PostListView
+
+    seeded = seed_posts(posts)
+    stdout.write(f'Постов в базе: {Post.objects.count()} '
+                 f'(досоздано {seeded})')
+    view = PostListView.as_view()
+
+    def run(title):
+        queryset = PostListView(request=None, kwargs={}).get_queryset()
+        stdout.write(f'\n== {title} ==')
+        stdout.write(queryset[:PostListView.paginate_by].explain())
+        samples = measure(lambda: render_view(view), repeat,
+                          setup=clear_caches)
+        stdout.write(f'PostListView: {format_samples(samples)}')
+
+    with without_indexes(Post):
+        run('без индексов')
+    run('с индексами')
+
+
+def bench_comments(stdout, repeat, comments, **options):
+    """План запроса комментариев и время PostDetailView без индекса и с ним.
+
+    Страница рендерится от имени автора поста, чтобы замеры не попадали
+    в полностраничный кэш.
+    """
+    from blog.views import PostDetailView
+
+    post = seed_comments(comments)
+    stdout.write(f'Комментариев у поста {post.pk}: {post.comments.count()}')
+    view = PostDetailView.as_view()
+
+    def run(title):
+        queryset = post.comments.select_related('author').order_by(
+            'created_at', 'id')
+        stdout.write(f'\n== {title} ==')
+        stdout.write(queryset[:NUM_COMMENTS + 1].explain())
+        clear_caches()
+        samples = measure(
+            lambda: render_view(view, post.get_absolute_url(),
+                                user=post.author, post_id=post.pk),
+            repeat,
+        )
+        stdout.write(f'PostDetailView: {format_samples(samples)}')
+
+    with without_indexes(Comment):
+        run('без индекса')
+    run('с индексом')
+
+
+def fetched_payload(queryset):
+    """Число колонок и суммарный размер значений, которые вернула база."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        payload = sum(len(str(value)) for row in cursor.fetchall()
+                      for value in row if value is not None)
+        return len(cursor.description), payload
+
+
+def bench_projection(stdout, repeat, posts, **options):
+    """Объём данных, память и время выборки ленты: все колонки и проекция."""
+    seeded = seed_posts(posts)
+    stdout.write(f'Постов в базе: {Post.objects.count()} '
+                 f'(досоздано {seeded}), выборка {PROJECTION_ROWS} строк')
+    stdout.write(f'{"выборка":<18}{"колонок":>9}{"КБ из БД":>10}'
+                 f'{"пик КБ":>9}{"p50":>9}{"p95":>9}')
+    feed = get_post_list().order_by('-pub_date')
+    for title, queryset in (('все колонки', feed),
+                            ('проекция ленты', only_feed_fields(feed))):
+        queryset = queryset[:PROJECTION_ROWS]
+        columns, payload = fetched_payload(queryset)
+        tracemalloc.start()
+        list(queryset.all())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        samples = measure(lambda: list(queryset.all()), repeat)
+        stdout.write(
+            f'{title:<18}{columns:>9}{payload // 1024:>10}{peak // 1024:>9}'
+            f'{percentile(samples, 50):>9.2f}{percentile(samples, 95):>9.2f}'
+        )
+
+
+def view_urls():
+    """Адреса основных страниц на самых «тяжёлых» объектах базы."""
+    post = Post.objects.order_by('-comment_count').first()
+    category = Category.objects.annotate(
+        total=Count('posts')).order_by('-total').first()
+    author = User.objects.annotate(
+        total=Count('posts')).order_by('-total').first()
+    if post is None:
+        return {}
+    deep_page = max(1, get_post_list().count() // NUM_POSTS // 2)
+    return {
+        'PostListView': reverse('blog:index'),
+        'PostListView deep': f"{reverse('blog:index')}?page={deep_page}",
+        'PostDetailView': post.get_absolute_url(),
+        'CategoryPostsListView': reverse('blog:category_posts',
+                                         args=[category.slug]),
+        'ProfileListView': reverse('blog:profile', args=[author.username]),
+    }
+
+
+@override_settings(DEBUG=False)
+def bench_views(stdout, repeat, warm=False, **options):
+    """Задержка, число запросов, размер ответа и пик памяти по страницам.
+
+    Данные берутся из текущей базы, их готовит seed_blog. По умолчанию
+    кэши очищаются перед каждым запросом, чтобы мерить работу с базой
+    и рендер; с warm=True измеряются повторные попадания в кэш. DEBUG
+    отключается, чтобы не мешали debug_toolbar и журнал запросов.
+    """
+    client = Client(HTTP_HOST='localhost')
+    urls = view_urls()
+    if not urls:
+        stdout.write('База пуста: сначала выполните seed_blog.')
+        return
+    stdout.write(f'{"страница":<24}{"p50":>9}{"p95":>9}{"p99":>9}'
+                 f'{"запросов":>10}{"байт":>10}{"пик КБ":>9}')
+    for name, url in urls.items():
+        samples = []
+        for _ in range(repeat):
+            if not warm:
+                clear_caches()
+            started = time.perf_counter()
+            response = client.get(url)
+            samples.append((time.perf_counter() - started) * 1000)
+        if not warm:
+            clear_caches()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stdout.write(
+            f'{name:<24}{percentile(samples, 50):>9.2f}'
+            f'{percentile(samples, 95):>9.2f}{percentile(samples, 99):>9.2f}'
+            f'{len(queries):>10}{len(response.content):>10}'
+            f'{peak // 1024:>9}'
+        )
+
+
+def templates_setting(cached):
+    """Копия settings.TEMPLATES с кэширующим загрузчиком или без него."""
+    templates = copy.deepcopy(settings.TEMPLATES)
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    for engine in templates:
+        engine['APP_DIRS'] = False
+        engine.setdefault('OPTIONS', {})['loaders'] = loaders
+    return templates
+
+
+@contextmanager
+def timed_templates():
+    """Собирает время каждого рендера по имени шаблона.
+
+    Время включает вложенные include и разбор подключаемых шаблонов, то
+    есть показывает, во что обходится шаблон вместе с поддеревом.
+    """
+    timings = defaultdict(list)
+    render = Template._render
+
+    def timed_render(template, context):
+        started = time.perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            timings[template.origin.template_name or '<string>'].append(
+                (time.perf_counter() - started) * 1000
+            )
+
+    Template._render = timed_render
+    try:
+        yield timings
+    finally:
+        Template._render = render
+
+
+@override_settings(DEBUG=False)
+def bench_templates(stdout, repeat, **options):
+    """Время рендера каждого шаблона без кэша загрузчика и с ним.
+
+    Открываются страницы из сценария views с очищенными кэшами данных;
+    для кэширующего загрузчика шаблоны заранее прогреваются, как при
+    старте воркера с WARM_TEMPLATES.
+    """
+    client = Client(HTTP_HOST='localhost')
+    urls = view_urls()
+    if not urls:
+        stdout.write('База пуста: сначала выполните seed_blog.')
+        return
+    results = {}
+    for cached in (False, True):
+        with override_settings(TEMPLATES=templates_setting(cached)):
+            if cached:
+                warm_templates()
+            with timed_templates() as timings:
+                for _ in range(repeat):
+                    for url in urls.values():
+                        clear_caches()
+                        client.get(url)
+        results[cached] = timings
+    stdout.write('p50 — один рендер шаблона, «прогон» — сумма по всем '
+                 'страницам сценария, мс.')
+    stdout.write(f'{"шаблон":<32}{"рендеров":>9}{"p50":>8}{"p50 кэш":>9}'
+                 f'{"прогон":>9}{"прогон кэш":>12}')
+    names = sorted(results[False], key=lambda name: -sum(
+        results[False][name]))
+    for name in names:
+        uncached, cached = results[False][name], results[True].get(name, [0])
+        stdout.write(
+            f'{name:<32}{len(uncached) // repeat:>9}'
+            f'{percentile(uncached, 50):>8.2f}{percentile(cached, 50):>9.2f}'
+            f'{sum(uncached) / repeat:>9.1f}{sum(cached) / repeat:>12.1f}'
+        )
+
+
+SCENARIOS = {
+    'comments': bench_comments,
+    'feed': bench_feed,
+    'projection': bench_projection,
+    'templates': bench_templates,
+    'views': bench_views,
+}
@@ -0,0 +1,164 @@
+import hashlib
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+
+ALL_PAGES_TAG = 'all'
+INDEX_TAG = 'index'
+
+# Бэкенды, у которых каждый процесс видит только свои записи.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+post_card_stats = Counter(hits=0, misses=0)
+
+
+def post_card_key(post):
+    """Ключ фрагмента карточки: id поста и версия его последнего изменения.
+
+    Версию updated_at продвигают сохранение поста и обработчики сигналов
+    комментариев, категорий и местоположений, поэтому устаревшие
+    фрагменты просто перестают запрашиваться и истекают по TTL.
+    """
+    return f'post_card:{post.pk}:{post.updated_at.timestamp()}'
+
+
+def render_post_card(post):
+    """HTML карточки поста из кэша фрагментов или свежий рендер."""
+    cache = caches[settings.POST_CARD_CACHE]
+    key = post_card_key(post)
+    html = cache.get(key)
+    if html is not None:
+        post_card_stats['hits'] += 1
+        return html
+    post_card_stats['misses'] += 1
+    html = render_to_string(POST_CARD_TEMPLATE, {'post': post})
+    cache.set(key, html)
+    return html
+
+
+def page_cache_is_shared():
+    """Видят ли все процессы одни и те же записи PAGE_CACHE."""
+    backend = settings.CACHES[settings.PAGE_CACHE]['BACKEND']
+    return backend not in PROCESS_LOCAL_BACKENDS
+
+
+def page_cache_timeout():
+    """TTL страниц: полный для общего кэша, короткий для кэша процесса.
+
+    Сброс тегов из другого воркера до локального кэша не доходит, поэтому
+    устаревшая страница живёт не дольше PAGE_CACHE_LOCAL_TIMEOUT.
+    """
+    if page_cache_is_shared():
+        return settings.PAGE_CACHE_TIMEOUT
+    return min(settings.PAGE_CACHE_TIMEOUT, settings.PAGE_CACHE_LOCAL_TIMEOUT)
+
+
+def local_value_timeout():
+    """TTL служебных значений кэша: бессрочно только в общем кэше."""
+    return None if page_cache_is_shared() else (
+        settings.PAGE_CACHE_LOCAL_TIMEOUT
+    )
+
+
+def _tag_key(tag):
+    return f'page_tag:{tag}'
+
+
+def post_page_tags(post_id, category_id, author_id):
+    """Теги страниц, на которых виден пост."""
+    return (INDEX_TAG, f'post:{post_id}', f'category:{category_id}',
+            f'profile:{author_id}')
+
+
+def count_tag(tag):
+    """Тег числа постов ленты со страниц с тегом tag.
+
+    Сбрасывается, только когда пост входит в ленту или покидает её, а не
+    при каждом комментарии или правке текста, как теги страниц.
+    """
+    return tag if tag == ALL_PAGES_TAG else f'count:{tag}'
+
+
+def post_count_tags(category_id, author_id):
+    """Теги чисел постов лент, в которые входит пост."""
+    return tuple(count_tag(tag) for tag in (
+        INDEX_TAG, f'category:{category_id}', f'profile:{author_id}'
+    ))
+
+
+def page_cache_allowed(request):
+    """Можно ли отдать или сохранить страницу в полностраничном кэше."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    if 'debug_toolbar' in settings.INSTALLED_APPS:
+        from debug_toolbar.middleware import get_show_toolbar
+        if get_show_toolbar()(request):
+            return False
+    return True
+
+
+def page_cache_key(request):
+    url = request.build_absolute_uri()
+    return f'page:{hashlib.md5(url.encode()).hexdigest()}'
+
+
+def get_tagged(key):
+    """Значение из кэша, если ни один из его тегов не был сброшен."""
+    cache = caches[settings.PAGE_CACHE]
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    versions, value = entry
+    current = cache.get_many([_tag_key(tag) for tag in versions])
+    for tag, version in versions.items():
+        if current.get(_tag_key(tag)) != version:
+            return None
+    return value
+
+
+def set_tagged(key, tags, value, timeout):
+    """Сохраняет значение вместе с текущими версиями его тегов."""
+    cache = caches[settings.PAGE_CACHE]
+    tag_keys = {tag: _tag_key(tag) for tag in tags}
+    current = cache.get_many(tag_keys.values())
+    missing = {
+        tag_key: time.time_ns()
+        for tag_key in tag_keys.values() if tag_key not in current
+    }
+    if missing:
+        cache.set_many(missing, None)
+        current.update(missing)
+    versions = {tag: current[tag_key] for tag, tag_key in tag_keys.items()}
+    cache.set(key, (versions, value), timeout)
+
+
+def get_cached_page(key):
+    """Ответ из кэша, если ни один из его тегов не был сброшен."""
+    return get_tagged(key)
+
+
+def store_page(key, tags, response, timeout):
+    """Сохраняет ответ вместе с текущими версиями его тегов."""
+    if (response.status_code != 200 or response.cookies
+            or response.streaming
+            or response.has_header('Cache-Control')):
+        return
+    set_tagged(key, tags, response, timeout)
+
+
+def invalidate_pages(*tags):
+    """Сбрасывает все закэшированные страницы с любым из тегов."""
+    version = time.time_ns()
+    caches[settings.PAGE_CACHE].set_many(
+        {_tag_key(tag): version for tag in tags}, None
+    )
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from blog.cache import page_cache_is_shared
+
+
+@register(Tags.caches, deploy=True)
+def check_page_cache_shared(app_configs, **kwargs):
+    """Полностраничный кэш должен быть общим для всех воркеров."""
+    if page_cache_is_shared():
+        return []
+    return [Warning(
+        f'Кэш PAGE_CACHE ({settings.PAGE_CACHE!r}) хранится в памяти '
+        'процесса: сброс страниц не доходит до других воркеров, и TTL '
+        'ограничен PAGE_CACHE_LOCAL_TIMEOUT.',
+        hint='Укажите общий бэкенд: Redis, memcached или DatabaseCache.',
+        id='blog.W001',
+    )]
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime, time
+from itertools import groupby
+from operator import attrgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comment
+from blog.utils import get_post_list
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def parse_since(value):
+    """Момент времени для инкрементальной выгрузки из строки ISO 8601."""
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            since = datetime.combine(parse_date(value), time.min)
+    except (TypeError, ValueError):
+        raise ValueError(f'Некорректная дата: {value!r}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def serialize_post(post):
+    location = post.location
+    return {
+        'id': post.pk,
+        'title': post.title,
+        'text': post.text,
+        'pub_date': post.pub_date,
+        'created_at': post.created_at,
+        'author': post.author.username,
+        'category': post.category.slug,
+        'location': (
+            location.name if location and location.is_published else None
+        ),
+        'image': post.image.name or None,
+        'comment_count': post.comment_count,
+    }
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.pk,
+        'text': comment.text,
+        'created_at': comment.created_at,
+        'author': comment.author.username,
+    }
+
+
+def _comments_by_post(posts):
+    """Пары (id поста, комментарии) по возрастанию id поста.
+
+    Комментарии читаются серверным итератором, поэтому в памяти
+    оказываются только комментарии текущего поста.
+    """
+    comments = Comment.objects.filter(
+        post__in=posts
+    ).select_related('author').order_by('post_id', 'created_at', 'pk')
+    return groupby(comments.iterator(), key=attrgetter('post_id'))
+
+
+def _dump_chunk(posts, with_comments):
+    """Строки NDJSON пачки постов, упорядоченной по возрастанию id."""
+    groups = _comments_by_post(posts) if with_comments else iter(())
+    post_id, group = next(groups, (None, ()))
+    for post in posts:
+        data = serialize_post(post)
+        if with_comments:
+            data['comments'] = []
+            if post_id == post.pk:
+                data['comments'] = [
+                    serialize_comment(comment) for comment in group
+                ]
+                post_id, group = next(groups, (None, ()))
+        yield json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield '\n'
+
+
+def iter_posts_ndjson(since=None, with_comments=False,
+                      chunk_size=EXPORT_CHUNK_SIZE):
+    """Опубликованные посты построчно в формате NDJSON.
+
+    Посты читаются серверным итератором пачками по chunk_size, так что
+    расход памяти не зависит от размера таблицы. При since выгружаются
+    только посты, созданные или опубликованные начиная с этого момента.
+    """
+    posts = get_post_list().order_by('pk')
+    if since is not None:
+        posts = posts.filter(Q(created_at__gte=since) | Q(pub_date__gte=since))
+    chunk = []
+    for post in posts.iterator(chunk_size=chunk_size):
+        chunk.append(post)
+        if len(chunk) == chunk_size:
+            yield from _dump_chunk(chunk, with_comments)
+            chunk = []
+    if chunk:
+        yield from _dump_chunk(chunk, with_comments)
@@ -1,13 +1,47 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
 
 from .models import Comment, Post
+from .uploads import read_image_header, recompress_image
+
+
+class HeaderImageField(forms.ImageField):
+    """ImageField, проверяющий только заголовок файла, без verify()."""
+
+    def to_python(self, data):
+        upload = forms.FileField.to_python(self, data)
+        if upload is not None:
+            read_image_header(upload)
+        return upload
 
 
 class PostForm(forms.ModelForm):
 
+    def __init__(self, *args, upload_errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.upload_errors = upload_errors or {}
+        self.recompressed = None
+
+    def clean_image(self):
+        if 'image' in self.upload_errors:
+            raise forms.ValidationError(self.upload_errors['image'])
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            try:
+                self.recompressed = recompress_image(image)
+            except (OSError, Image.DecompressionBombError):
+                raise forms.ValidationError(
+                    'Изображение повреждено или не может быть прочитано.',
+                    code='invalid_image',
+                )
+            return self.recompressed
+        return image
+
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': HeaderImageField}
         widgets = {
             'pub_date': forms.DateTimeInput(format='%Y-%m-%dT%H:%M',
                                             attrs={'type': 'datetime-local'})
@@ -0,0 +1,121 @@
+import hashlib
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from blog.cache import (
+    ALL_PAGES_TAG, get_tagged, invalidate_pages, page_cache_timeout,
+    post_page_tags, set_tagged
+)
+from blog.models import Post
+from core.tasks import task
+
+RENDITIONS_DIR = 'renditions'
+RENDITION_FORMAT = 'JPEG'
+RENDITION_QUALITY = 80
+
+
+def rendition_name(name, width):
+    """Путь уменьшенной копии изображения name шириной width."""
+    path = PurePosixPath(name)
+    return f'{RENDITIONS_DIR}/{path.parent}/{path.stem}_{width}w.jpg'
+
+
+def generate_renditions(name, storage=default_storage, force=False):
+    """Создаёт уменьшенные копии изображения для всех POST_IMAGE_WIDTHS.
+
+    Копии перекодируются в JPEG без EXIF, с учётом поворота из EXIF.
+    Копии не шире оригинала: если оригинал меньше самой узкой ширины,
+    создаётся одна копия исходного размера — она же служит признаком
+    того, что изображение обработано. Возвращает число новых файлов.
+    """
+    widths = sorted(settings.POST_IMAGE_WIDTHS)
+    created = 0
+    with storage.open(name) as file, Image.open(file) as original:
+        # Для JPEG декодер сразу уменьшает изображение кратно 1/2–1/8,
+        # не разворачивая в памяти полноразмерный снимок.
+        original.draft('RGB', (widths[-1], widths[-1]))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        for width in widths:
+            if width > image.width and width != widths[0]:
+                break
+            target = rendition_name(name, width)
+            if storage.exists(target):
+                if not force:
+                    continue
+                storage.delete(target)
+            rendition = image.copy()
+            rendition.thumbnail((width, image.height), Image.LANCZOS)
+            buffer = BytesIO()
+            rendition.save(buffer, RENDITION_FORMAT,
+                           quality=RENDITION_QUALITY, optimize=True,
+                           progressive=True)
+            storage.save(target, ContentFile(buffer.getvalue()))
+            created += 1
+    return created
+
+
+def rendition_tag(name):
+    """Тег кэша srcset изображения name; сбрасывается при создании копий."""
+    return f'renditions:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def rendition_srcset(image, storage=default_storage):
+    """Значение srcset по готовым копиям или '' с постановкой в очередь.
+
+    Для старых изображений без копий страница выводит оригинал, а
+    копии создаются фоновой задачей при первом показе. Результат
+    кэшируется до сброса тега изображения, поэтому показ страницы не
+    проверяет файлы копий в хранилище и ключ задачи в базе.
+    """
+    if not image:
+        return ''
+    tag = rendition_tag(image.name)
+    key = f'srcset:{tag}'
+    srcset = get_tagged(key)
+    if srcset is None:
+        srcset = _build_srcset(image.name, storage)
+        set_tagged(key, (ALL_PAGES_TAG, tag), srcset, page_cache_timeout())
+    return srcset
+
+
+def _build_srcset(name, storage):
+    entries = []
+    for width in sorted(settings.POST_IMAGE_WIDTHS):
+        target = rendition_name(name, width)
+        if not storage.exists(target):
+            break
+        entries.append(f'{storage.url(target)} {width}w')
+    if not entries:
+        enqueue_renditions(name)
+    return ', '.join(entries)
+
+
+def refresh_posts_with_image(name):
+    """Сбрасывает кэш srcset, карточек и страниц постов с изображением
+    name."""
+    invalidate_pages(rendition_tag(name))
+    posts = Post.objects.filter(image=name)
+    for post_id, category_id, author_id in posts.values_list(
+            'pk', 'category_id', 'author_id'):
+        invalidate_pages(*post_page_tags(post_id, category_id, author_id))
+    posts.update(updated_at=timezone.now())
+
+
+@task
+def make_renditions(name):
+    """Фоновая задача: копии изображения и обновление карточек с ним."""
+    if generate_renditions(name):
+        refresh_posts_with_image(name)
+
+
+def enqueue_renditions(name):
+    """Ставит создание копий изображения в очередь один раз на файл."""
+    make_renditions.enqueue(key=f'renditions:{name}', name=name)
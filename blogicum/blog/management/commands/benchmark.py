@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Замеряет производительность страниц блога.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(SCENARIOS))
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Число замеров для каждой страницы.')
+        parser.add_argument('--posts', type=int, default=1_000_000,
+                            help='Минимальное число постов в базе '
+                                 '(сценарии feed и projection).')
+        parser.add_argument('--comments', type=int, default=100_000,
+                            help='Минимальное число комментариев у поста '
+                                 '(сценарий comments).')
+        parser.add_argument('--warm', action='store_true',
+                            help='Не очищать кэши между замерами '
+                                 '(сценарий views).')
+
+    def handle(self, *args, scenario, **options):
+        SCENARIOS[scenario](self.stdout, **options)
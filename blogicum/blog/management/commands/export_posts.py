@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import EXPORT_CHUNK_SIZE, iter_posts_ndjson, parse_since
+
+
+class Command(BaseCommand):
+    help = 'Выгружает опубликованные посты в формате NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since',
+                            help='Только посты, созданные или '
+                                 'опубликованные с этого момента (ISO 8601).')
+        parser.add_argument('--comments', action='store_true',
+                            help='Добавить к постам их комментарии.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', '-o',
+                            help='Файл для выгрузки, по умолчанию stdout.')
+
+    def handle(self, *args, since, comments, chunk_size, output, **options):
+        try:
+            since = parse_since(since) if since else None
+        except ValueError as error:
+            raise CommandError(error)
+        lines = iter_posts_ndjson(since, comments, chunk_size)
+        if output is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(output, 'w', encoding='utf-8') as file:
+            file.writelines(lines)
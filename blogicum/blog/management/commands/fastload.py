@@ -0,0 +1,280 @@
+import json
+import time
+from collections import Counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.apps import apps
+from django.core.serializers import sort_dependencies
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+)
+from django.utils import timezone
+
+from blog.cache import ALL_PAGES_TAG, invalidate_pages
+from blog.utils import reset_next_publication
+
+READ_SIZE = 1 << 16
+SEPARATORS = ' \t\r\n,'
+ITEM_ENDS = tuple(SEPARATORS + ']')
+
+# Пересчёт денормализованных данных после вставки в обход сигналов.
+REBUILD_COMMANDS = (
+    'recount_comments', 'rebuild_author_stats', 'fill_excerpts',
+    'rebuild_search_index',
+)
+
+
+def _open_array(file, read_size):
+    """Пропускает начало файла до «[»; возвращает остаток прочитанного."""
+    buffer = ''
+    while not buffer:
+        chunk = file.read(read_size)
+        buffer = chunk.lstrip()
+        if not chunk:
+            break
+    if not buffer.startswith('['):
+        raise ValueError('Ожидается JSON-массив объектов.')
+    return buffer[1:]
+
+
+def iter_json_array(file, read_size=READ_SIZE):
+    """Элементы JSON-массива верхнего уровня по одному, без чтения всего
+    файла в память.
+
+    Элемент отдаётся, только когда за ним в буфере виден разделитель:
+    иначе он может продолжаться в следующем куске (например, число).
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = _open_array(file, read_size), 0, False
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            if buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                if eof or buffer[end:end + 1] in ITEM_ENDS:
+                    yield item
+                    position = end
+                    continue
+        elif eof:
+            raise ValueError('Неожиданный конец JSON-массива.')
+        chunk = file.read(read_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+class TableLoader:
+    """Готовый INSERT таблицы и преобразование объектов фикстуры в строки.
+
+    Значения проходят через to_python() и get_db_prep_save() полей, как при
+    сохранении модели, но без создания экземпляров и сборки SQL на каждую
+    пачку; строки пишутся через executemany().
+    """
+
+    def __init__(self, connection, model, fields, ignore_conflicts):
+        self.connection = connection
+        self.model = model
+        self.fields = fields
+        self.rows = []
+        quote_name = connection.ops.quote_name
+        self.sql = '{} {} ({}) VALUES ({}){}'.format(
+            connection.ops.insert_statement(ignore_conflicts),
+            quote_name(model._meta.db_table),
+            ', '.join(quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+            connection.ops.ignore_conflicts_suffix_sql(ignore_conflicts),
+        )
+
+    def add(self, values):
+        self.rows.append(tuple(
+            field.get_db_prep_save(value, self.connection)
+            for field, value in zip(self.fields, values)
+        ))
+
+    def flush(self):
+        """Пишет накопленные строки; возвращает число вставленных.
+
+        С ignore_conflicts часть строк пропускается, поэтому берётся
+        rowcount курсора, если драйвер его сообщает.
+        """
+        with self.connection.cursor() as cursor:
+            cursor.executemany(self.sql, self.rows)
+            count = cursor.rowcount
+        if count is None or count < 0:
+            count = len(self.rows)
+        self.rows = []
+        return count
+
+
+def to_python(field, value):
+    if value is None:
+        return None
+    if field.remote_field:
+        return field.target_field.to_python(value)
+    return field.to_python(value)
+
+
+def missing_value(field):
+    if getattr(field, 'auto_now', False) \
+            or getattr(field, 'auto_now_add', False):
+        return timezone.now()
+    return field.get_default()
+
+
+class Command(BaseCommand):
+    help = ('Быстро загружает JSON-фикстуру с первичными ключами (формат '
+            'dumpdata) пачками через executemany, без сигналов и '
+            'построчного сохранения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к JSON-фикстуре.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('-e', '--exclude', action='append', default=[],
+                            help='Пропустить модель, например '
+                                 'auth.permission.')
+        parser.add_argument('--ignore-conflicts', action='store_true',
+                            help='Пропускать строки с уже существующими '
+                                 'ключами.')
+
+    def handle(self, *args, fixture, batch_size, database, exclude,
+               ignore_conflicts, **options):
+        self.connection = connections[database]
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.excluded = {label.lower() for label in exclude}
+        self.loaders = {}
+        self.counts = Counter()
+        started = time.perf_counter()
+        try:
+            with open(fixture, encoding='utf-8') as file, \
+                    transaction.atomic(using=database):
+                with self.connection.constraint_checks_disabled():
+                    models = self.load(iter_json_array(file))
+                self.connection.check_constraints(table_names=[
+                    model._meta.db_table for model in models
+                ])
+                self.reset_sequences(models)
+        except (OSError, LookupError, ValueError, IntegrityError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        total = sum(self.counts.values())
+        for label, count in sorted(self.counts.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(
+            f'Загружено строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с).'
+        )
+        # Массовая вставка не вызывает сигналы: пересчитываем
+        # денормализованные данные и сбрасываем кэши страниц.
+        for name in REBUILD_COMMANDS:
+            step_started = time.perf_counter()
+            call_command(name, stdout=self.stdout)
+            self.stdout.write(
+                f'{name}: {time.perf_counter() - step_started:.1f} с.'
+            )
+        reset_next_publication()
+        invalidate_pages(ALL_PAGES_TAG)
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего: {time.perf_counter() - started:.1f} с, вставка '
+            f'{elapsed:.1f} с.'
+        ))
+
+    def load(self, items):
+        """Раскладывает объекты по таблицам и пишет полными пачками.
+
+        Порядок записи зависимостям моделей не следует: полные пачки
+        пишутся по мере чтения файла, а остатки — в порядке
+        sort_dependencies(), который при циклах не гарантирован.
+        Корректность держится на том, что проверки внешних ключей
+        отключены или отложены до check_constraints() после загрузки.
+        """
+        models = set()
+        for item in items:
+            model = apps.get_model(item['model'])
+            if model._meta.label_lower in self.excluded:
+                continue
+            models.add(model)
+            self.add(model, item)
+        for model in sort_dependencies([(None, list(models))],
+                                       allow_cycles=True):
+            for loader in self.loaders_of(model):
+                self.flush(loader)
+        return models
+
+    def loaders_of(self, model):
+        table = self.loaders.get(model)
+        if table is not None:
+            yield table
+        for field in model._meta.local_many_to_many:
+            through = self.loaders.get(field.remote_field.through)
+            if through is not None:
+                yield through
+
+    def loader(self, model, fields):
+        if model not in self.loaders:
+            self.loaders[model] = TableLoader(
+                self.connection, model, fields, self.ignore_conflicts
+            )
+        return self.loaders[model]
+
+    def add(self, model, item):
+        fields = model._meta.local_concrete_fields
+        data = item.get('fields', {})
+        pk = model._meta.pk.to_python(item['pk'])
+        values = []
+        for field in fields:
+            if field.primary_key:
+                values.append(pk)
+            elif field.name in data:
+                values.append(to_python(field, data[field.name]))
+            else:
+                values.append(missing_value(field))
+        self.push(self.loader(model, fields), values)
+        for field in model._meta.local_many_to_many:
+            through = field.remote_field.through
+            through_fields = [
+                through._meta.get_field(field.m2m_field_name()),
+                through._meta.get_field(field.m2m_reverse_field_name()),
+            ]
+            link_loader = self.loader(through, through_fields)
+            for related_pk in data.get(field.name, ()):
+                self.push(link_loader, (pk, to_python(through_fields[1],
+                                                      related_pk)))
+
+    def push(self, loader, values):
+        loader.add(values)
+        if len(loader.rows) >= self.batch_size:
+            self.flush(loader)
+
+    def flush(self, loader):
+        if not loader.rows:
+            return
+        label = loader.model._meta.label
+        try:
+            self.counts[label] += loader.flush()
+        except IntegrityError as error:
+            raise CommandError(
+                f'{label}: {error}. Строки с такими ключами уже есть в '
+                'базе: например, права и типы содержимого создаются '
+                'миграциями. Исключите их (-e auth.permission -e '
+                'contenttypes.contenttype) или загрузите с '
+                '--ignore-conflicts.'
+            )
+
+    def reset_sequences(self, models):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), models
+        )
+        with self.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
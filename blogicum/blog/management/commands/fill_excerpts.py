@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post, make_excerpt
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true', dest='recompute',
+                            help='Пересчитать анонсы всех постов, а не '
+                                 'только пустые.')
+
+    def handle(self, *args, batch_size, recompute, **options):
+        posts = Post.objects.all()
+        if not recompute:
+            posts = posts.filter(excerpt='')
+        filled = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    posts.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only('pk', 'text', 'excerpt')[:batch_size]
+                )
+                if not batch:
+                    break
+                changed = []
+                for post in batch:
+                    excerpt = make_excerpt(post.text)
+                    if post.excerpt != excerpt:
+                        post.excerpt = excerpt
+                        changed.append(post)
+                Post.objects.bulk_update(changed, ('excerpt',))
+            filled += len(changed)
+            last_pk = batch[-1].pk
+        self.stdout.write(f'Заполнено анонсов: {filled}.')
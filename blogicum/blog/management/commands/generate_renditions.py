@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import ALL_PAGES_TAG, invalidate_pages
+from blog.images import generate_renditions
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии изображений постов, у которых их '
+            'ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Пересоздать уже существующие копии.')
+
+    def handle(self, *args, force, **options):
+        names = (
+            Post.objects.exclude(image='')
+            .order_by('image')
+            .values_list('image', flat=True)
+            .distinct()
+        )
+        created = failed = 0
+        for name in names.iterator():
+            try:
+                created += generate_renditions(name, force=force)
+            except OSError as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+        if created:
+            Post.objects.exclude(image='').update(updated_at=timezone.now())
+            invalidate_pages(ALL_PAGES_TAG)
+        self.stdout.write(
+            f'Создано копий: {created}, ошибок: {failed}.'
+        )
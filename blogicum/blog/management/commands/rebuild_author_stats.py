@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import AuthorStats, User
+from blog.stats import compute_author_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает статистику авторов по постам и комментариям.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        rebuilt = 0
+        last_pk = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            with transaction.atomic():
+                AuthorStats.objects.filter(user_id__in=user_ids).delete()
+                AuthorStats.objects.bulk_create(
+                    compute_author_stats(user_ids)
+                )
+            rebuilt += len(user_ids)
+            last_pk = user_ids[-1]
+        self.stdout.write(f'Пересобрана статистика авторов: {rebuilt}.')
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+from blog.search import get_search_index
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает индекс полнотекстового поиска по постам '
+            'пачками, каждая в своей транзакции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        search_index = get_search_index()
+        posts = Post.objects.only('pk', 'title', 'text').order_by('pk')
+        indexed = 0
+        last_pk = 0
+        search_index.clear()
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            # Каждая пачка фиксируется отдельно, чтобы пересборка большой
+            # базы не держала одну транзакцию и блокировку записи.
+            with transaction.atomic():
+                search_index.index(batch)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f'Проиндексировано постов: {indexed}.')
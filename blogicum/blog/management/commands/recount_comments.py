@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поле comment_count у постов пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        repaired = checked = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                posts = list(
+                    Post.objects.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only('pk', 'comment_count')[:batch_size]
+                )
+                if not posts:
+                    break
+                counts = dict(
+                    Comment.objects.filter(post__in=posts)
+                    .order_by()
+                    .values_list('post')
+                    .annotate(total=Count('pk'))
+                )
+                drifted = []
+                for post in posts:
+                    actual = counts.get(post.pk, 0)
+                    if post.comment_count != actual:
+                        post.comment_count = actual
+                        drifted.append(post)
+                Post.objects.bulk_update(drifted, ('comment_count',))
+            checked += len(posts)
+            repaired += len(drifted)
+            last_pk = posts[-1].pk
+        self.stdout.write(
+            f'Проверено постов: {checked}, исправлено: {repaired}.'
+        )
@@ -0,0 +1,235 @@
+import itertools
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.cache import ALL_PAGES_TAG, invalidate_pages
+from blog.models import (
+    Category, Comment, Location, Post, User, make_excerpt
+)
+from blog.utils import reset_next_publication
+
+SEED_PASSWORD = 'blogicum-seed'
+TEXT_POOL_SIZE = 500
+N_CATEGORIES = 12
+N_LOCATIONS = 40
+FUTURE_SHARE = 0.03
+UNPUBLISHED_SHARE = 0.05
+HISTORY_DAYS = 5 * 365
+
+
+def zipf_weights(count, exponent=1.1):
+    """Накопленные веса распределения Ципфа: первые элементы популярнее."""
+    return list(itertools.accumulate(
+        1 / (rank ** exponent) for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные блога с перекосом: популярные '
+            'авторы, «горячие» посты, отложенные и скрытые публикации.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int,
+                            help='Зерно генератора для воспроизводимости.')
+
+    def handle(self, *args, users, posts, comments, batch_size, seed,
+               **options):
+        self.random = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.texts = [self.faker.text(max_nb_chars=1200)
+                      for _ in range(TEXT_POOL_SIZE)]
+        self.sentences = [self.faker.sentence()
+                          for _ in range(TEXT_POOL_SIZE)]
+        with transaction.atomic():
+            authors = self.create_users(users)
+            categories, locations = self.create_dictionaries()
+            post_dates = self.create_posts(posts, authors, categories,
+                                           locations)
+            self.create_comments(comments, post_dates, authors)
+        # bulk_create не вызывает сигналы, поэтому как после fastload.
+        call_command('recount_comments', stdout=self.stdout)
+        call_command('rebuild_author_stats', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        reset_next_publication()
+        invalidate_pages(ALL_PAGES_TAG)
+
+    def bulk_create(self, model, objects, created_at=False):
+        """Пишет объекты пачками по batch_size.
+
+        auto_now_add заменяет created_at моментом вставки, поэтому при
+        created_at сгенерированные даты записываются после вставки пачки.
+        """
+        created = 0
+        objects = iter(objects)
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                break
+            if created_at:
+                dates = [obj.created_at for obj in batch]
+                last_pk = self.last_pk(model)
+            model.objects.bulk_create(batch)
+            if created_at:
+                self.restore_created_at(model, batch, dates, last_pk)
+            created += len(batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+
+    def restore_created_at(self, model, batch, dates, last_pk):
+        # SQLite не возвращает id из bulk_create: внутри транзакции они
+        # идут подряд в порядке вставки. bulk_update() с CASE по пачке
+        # вдвое замедляет генерацию, поэтому UPDATE через executemany().
+        pks = [obj.pk for obj in batch]
+        if pks[0] is None:
+            pks = self.pks_after(model, last_pk)
+        field = model._meta.get_field('created_at')
+        quote_name = connection.ops.quote_name
+        sql = 'UPDATE {} SET {} = %s WHERE {} = %s'.format(
+            quote_name(model._meta.db_table), quote_name(field.column),
+            quote_name(model._meta.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (field.get_db_prep_save(date, connection), pk)
+                for date, pk in zip(dates, pks)
+            ])
+
+    def last_pk(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+
+    def pks_after(self, model, last_pk):
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def post_dates_after(self, last_pk):
+        """Пары (id, дата публикации) постов с id больше last_pk."""
+        return list(Post.objects.filter(pk__gt=last_pk).order_by(
+            'pk').values_list('pk', 'pub_date'))
+
+    def create_users(self, count):
+        if not count:
+            authors = list(User.objects.values_list('pk', flat=True))
+            if not authors:
+                raise CommandError('Нет пользователей: укажите --users.')
+            return authors
+        password = make_password(SEED_PASSWORD)
+        last_pk = self.last_pk(User)
+        self.bulk_create(User, (
+            User(
+                username=f'{self.faker.user_name()}_{last_pk + i}'[-150:],
+                first_name=self.faker.first_name(),
+                last_name=self.faker.last_name(),
+                password=password,
+            )
+            for i in range(1, count + 1)
+        ))
+        return self.pks_after(User, last_pk)
+
+    def create_dictionaries(self):
+        categories = list(Category.objects.values_list('pk', flat=True))
+        if not categories:
+            self.bulk_create(Category, (
+                Category(
+                    title=self.faker.word().capitalize(),
+                    description=self.random.choice(self.sentences),
+                    slug=f'category-{i}',
+                    is_published=i % N_CATEGORIES != 1,
+                )
+                for i in range(N_CATEGORIES)
+            ))
+            categories = list(Category.objects.values_list('pk', flat=True))
+        locations = list(Location.objects.values_list('pk', flat=True))
+        if not locations:
+            self.bulk_create(Location, (
+                Location(name=self.faker.city(), is_published=i % 10 != 1)
+                for i in range(N_LOCATIONS)
+            ))
+            locations = list(Location.objects.values_list('pk', flat=True))
+        return categories, locations
+
+    def random_pub_date(self, now):
+        if self.random.random() < FUTURE_SHARE:
+            return now + timedelta(minutes=self.random.randrange(1, 60_000))
+        # Квадрат равномерной величины сгущает посты к текущей дате.
+        age = self.random.random() ** 2 * HISTORY_DAYS
+        return now - timedelta(days=age)
+
+    def random_comment_date(self, pub_date, now):
+        # Комментарии сгущаются к дате публикации поста; у отложенных
+        # постов они получают дату загрузки.
+        start = min(pub_date, now)
+        return start + (now - start) * self.random.random() ** 3
+
+    def new_post(self, now, **kwargs):
+        pub_date = self.random_pub_date(now)
+        created_at = min(pub_date, now) - timedelta(
+            hours=self.random.random() * 48
+        )
+        return Post(pub_date=pub_date, created_at=created_at, **kwargs)
+
+    def create_posts(self, count, authors, categories, locations):
+        """Создаёт посты и возвращает их пары (id, дата публикации).
+
+        Без --posts возвращает None: комментарии пишутся к имеющимся.
+        """
+        if not count:
+            return None
+        now = timezone.now()
+        author_weights = zipf_weights(len(authors))
+        last_pk = self.last_pk(Post)
+        excerpts = [make_excerpt(text) for text in self.texts]
+        self.bulk_create(Post, (
+            self.new_post(
+                now,
+                title=self.random.choice(self.sentences)[:256],
+                text=self.texts[text],
+                excerpt=excerpts[text],
+                is_published=self.random.random() >= UNPUBLISHED_SHARE,
+                author_id=self.random.choices(
+                    authors, cum_weights=author_weights)[0],
+                category_id=self.random.choice(categories),
+                location_id=(self.random.choice(locations)
+                             if self.random.random() < 0.7 else None),
+            )
+            for text in (self.random.randrange(len(self.texts))
+                         for _ in range(count))
+        ), created_at=True)
+        return self.post_dates_after(last_pk)
+
+    def create_comments(self, count, post_dates, authors):
+        if not count:
+            return
+        if post_dates is None:
+            post_dates = self.post_dates_after(0)
+        if not post_dates:
+            raise CommandError('Нет постов для комментариев: укажите '
+                               '--posts.')
+        now = timezone.now()
+        hot_posts = post_dates[:]
+        self.random.shuffle(hot_posts)
+        post_weights = zipf_weights(len(hot_posts), exponent=1.2)
+        author_weights = zipf_weights(len(authors))
+        self.bulk_create(Comment, (
+            Comment(
+                text=self.random.choice(self.sentences),
+                post_id=post_id,
+                author_id=self.random.choices(
+                    authors, cum_weights=author_weights)[0],
+                created_at=self.random_comment_date(pub_date, now),
+            )
+            for post_id, pub_date in self.random.choices(
+                hot_posts, cum_weights=post_weights, k=count)
+        ), created_at=True)
@@ -0,0 +1,70 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:35
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def fill_author_stats(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+
+    def aggregate(model_name, function):
+        return Subquery(
+            apps.get_model('blog', model_name).objects.filter(
+                author=OuterRef('pk')
+            ).order_by().values('author').annotate(
+                value=function
+            ).values('value')
+        )
+
+    users = User.objects.annotate(
+        post_total=Coalesce(aggregate('Post', Count('pk')), 0),
+        comment_total=Coalesce(aggregate('Comment', Count('pk')), 0),
+        last_post=aggregate('Post', Max('created_at')),
+        last_comment=aggregate('Comment', Max('created_at')),
+    ).values_list(
+        'pk', 'post_total', 'comment_total', 'last_post', 'last_comment'
+    )
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(
+                user_id=pk,
+                post_count=posts,
+                comment_count=comments,
+                last_activity=max(
+                    filter(None, (last_post, last_comment)), default=None
+                ),
+            )
+            for pk, posts, comments, last_post, last_comment
+            in users.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0007_comment_post_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:38
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def fill_excerpt(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = []
+    for post in Post.objects.only('pk', 'text').iterator(chunk_size=1000):
+        post.excerpt = Truncator(post.text).words(10)
+        posts.append(post)
+        if len(posts) == 1000:
+            Post.objects.bulk_update(posts, ('excerpt',))
+            posts = []
+    Post.objects.bulk_update(posts, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpt, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:56
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    """Таблица FTS5 для SQLite; без FTS5 поиск работает по PostTerm."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            "title, body, tokenize='unicode61 remove_diacritics 0')"
+        )
+    except OperationalError:
+        pass
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, verbose_name='Термин')),
+                ('weight', models.PositiveIntegerField(verbose_name='Вес')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'термин поиска',
+                'verbose_name_plural': 'Индекс поиска',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postterm',
+            constraint=models.UniqueConstraint(fields=('term', 'post'), name='post_term_unique'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
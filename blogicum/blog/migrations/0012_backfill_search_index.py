@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_search_index(apps, schema_editor):
+    """Индексирует посты, созданные до появления поиска.
+
+    Слова приводятся к основам тем же blog.search.tokenize, что и
+    запросы, иначе индекс не совпадёт с поиском.
+    """
+    from blog.search import FTS5Index, TableIndex, fts5_available
+
+    Post = apps.get_model('blog', 'Post')
+    PostTerm = apps.get_model('blog', 'PostTerm')
+    backend = settings.SEARCH_BACKEND
+    if backend == 'auto':
+        backend = 'fts5' if fts5_available() else 'table'
+    posts = Post.objects.only('pk', 'title', 'text').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        if backend == 'fts5':
+            FTS5Index().index(batch)
+        else:
+            PostTerm.objects.filter(
+                post_id__in=[post.pk for post in batch]
+            ).delete()
+            PostTerm.objects.bulk_create(
+                PostTerm(post_id=post.pk, term=term, weight=weight)
+                for post in batch
+                for term, weight in TableIndex.weights(post).items()
+            )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_partial_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,18 @@
-from django.db.models import Count
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from blog.cache import (
+    ALL_PAGES_TAG, count_tag, get_cached_page, page_cache_allowed,
+    page_cache_key, page_cache_timeout, store_page
+)
 from blog.models import Comment, Post
-from blog.utils import get_post_list
+from blog.paginators import CachedCountPaginator, CursorPaginator
+from blog.uploads import LimitedTemporaryFileUploadHandler
+from blog.utils import (
+    get_feed_cache_timeout, get_post_list, only_feed_fields
+)
 
 NUM_POSTS = 10
 
@@ -9,10 +20,139 @@ NUM_POSTS = 10
 class PostMixin:
     model = Post
     paginate_by = NUM_POSTS
+    paginator_class = CachedCountPaginator
+    pagination_mode = None
+    page_range_window = None
+    page_range_edges = None
 
     def get_queryset(self):
-        return get_post_list().annotate(
-            comment_count=(Count('comments'))).order_by('-pub_date')
+        return only_feed_fields(get_post_list()).order_by('-pub_date')
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.POSTS_PAGINATION
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_count_cache_tags(self):
+        """Теги числа постов ленты: парные тегам её страниц."""
+        return tuple(count_tag(tag) for tag in self.get_cache_tags())
+
+    def get_count_cache_key(self):
+        return 'post_count:' + ':'.join(self.get_count_cache_tags())
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return self.paginator_class(
+            queryset, per_page,
+            cache_key=self.get_count_cache_key(),
+            cache_tags=self.get_count_cache_tags(),
+            timeout=get_feed_cache_timeout(page_cache_timeout()),
+            **kwargs,
+        )
+
+    def get_page_range(self, page):
+        """Номера страниц вокруг текущей и по краям, с многоточиями.
+
+        get_elided_page_range() строит только выводимые номера, поэтому
+        стоимость не зависит от числа страниц.
+        """
+        window = self.page_range_window
+        edges = self.page_range_edges
+        return list(page.paginator.get_elided_page_range(
+            page.number,
+            on_each_side=settings.PAGINATION_WINDOW
+            if window is None else window,
+            on_ends=settings.PAGINATION_EDGES if edges is None else edges,
+        ))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = context.get('page_obj')
+        if page is not None and hasattr(page, 'number'):
+            context['page_range'] = self.get_page_range(page)
+        return context
+
+
+class PageCacheMixin:
+    """Полностраничный кэш ответов для анонимных читателей.
+
+    Страница сохраняется с версиями тегов из get_cache_tags() и
+    перестаёт отдаваться, как только любой из тегов сброшен. Срок жизни
+    не выходит за ближайшую отложенную публикацию.
+    """
+
+    def get_cache_tags(self):
+        return (ALL_PAGES_TAG,)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not page_cache_allowed(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request)
+        response = get_cached_page(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+
+        def store(rendered):
+            if not request.META.get('CSRF_COOKIE_USED'):
+                store_page(
+                    key, self.get_cache_tags(), rendered,
+                    get_feed_cache_timeout(page_cache_timeout()),
+                )
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
+
+
+class ImageUploadMixin:
+    """Потоковая загрузка изображений с ограничением размера.
+
+    Обработчики загрузки можно заменить только до чтения request.POST,
+    а CsrfViewMiddleware читает его раньше view. Поэтому проверка CSRF
+    переносится в dispatch, после установки обработчика.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        self.upload_handler = LimitedTemporaryFileUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        try:
+            return csrf_protect(super().dispatch)(request, *args, **kwargs)
+        finally:
+            self.close_uploads(request)
+
+    def close_uploads(self, request):
+        """Закрывает и тем удаляет временные файлы загрузки."""
+        uploads = [upload for _, files in request.FILES.lists()
+                   for upload in files]
+        recompressed = getattr(getattr(self, 'form', None),
+                               'recompressed', None)
+        if recompressed is not None:
+            uploads.append(recompressed)
+        for upload in uploads:
+            upload.close()
+
+    def get_form(self, form_class=None):
+        self.form = super().get_form(form_class)
+        return self.form
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['upload_errors'] = self.upload_handler.rejected
+        return kwargs
 
 
 class CommentMixin:
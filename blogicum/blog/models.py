@@ -1,12 +1,19 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils.text import Truncator
 
 from core.models import PublishedCreatedModel
 
 
 User = get_user_model()
 TITLE_LIMIT = 20
+EXCERPT_WORDS = 10
+
+
+def make_excerpt(text):
+    """Первые EXCERPT_WORDS слов текста для карточки поста."""
+    return Truncator(text).words(EXCERPT_WORDS)
 
 
 class Location(PublishedCreatedModel):
@@ -74,16 +81,47 @@ class Post(PublishedCreatedModel):
     )
     image = models.ImageField('Изображение', upload_to='posts_images',
                               blank=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
+    excerpt = models.TextField('Анонс', blank=True, editable=False)
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            # Частичные индексы: условие is_published=True SQLite пишет
+            # голым столбцом, и префикс (is_published, ...) не помогает.
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_published_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:TITLE_LIMIT]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        self.excerpt = make_excerpt(self.text)
+        if update_fields is not None and 'text' in update_fields:
+            update_fields = {*update_fields, 'excerpt'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
@@ -108,10 +146,69 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
-        ordering = ('created_at',)
+        ordering = ('created_at', 'id')
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at', 'id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self):
         return f'Комментарий поста: {self.post}, автора: {self.author}'
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.post_id})
+
+
+class AuthorStats(models.Model):
+    """Счётчики автора для шапки профиля, обновляемые сигналами."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор',
+    )
+    post_count = models.PositiveIntegerField('Публикаций', default=0)
+    comment_count = models.PositiveIntegerField('Комментариев', default=0)
+    last_activity = models.DateTimeField(
+        'Последняя активность', null=True, blank=True
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'Статистика автора: {self.user}'
+
+
+class PostTerm(models.Model):
+    """Запись обратного индекса поиска для баз без FTS5.
+
+    weight — число вхождений основы слова в текст поста, вхождения в
+    заголовок учитываются с весом search.TITLE_WEIGHT.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name='Публикация',
+    )
+    term = models.CharField('Термин', max_length=64)
+    weight = models.PositiveIntegerField('Вес')
+
+    class Meta:
+        verbose_name = 'термин поиска'
+        verbose_name_plural = 'Индекс поиска'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'post'), name='post_term_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.term}: {self.post_id}'
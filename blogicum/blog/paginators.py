@@ -0,0 +1,267 @@
+import json
+from collections.abc import Sequence
+
+from django.core.paginator import EmptyPage, InvalidPage, Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from blog.cache import get_tagged, set_tagged
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def dump_cursor(direction, values):
+    """Курсор страницы: направление и ключ сортировки соседней записи."""
+    payload = json.dumps([direction, values], separators=(',', ':'))
+    return urlsafe_base64_encode(payload.encode())
+
+
+def load_cursor(cursor, size):
+    """Направление и сырые значения ключа из курсора длины size."""
+    try:
+        direction, values = json.loads(urlsafe_base64_decode(cursor))
+        if direction not in (NEXT, PREVIOUS) or len(values) != size:
+            raise ValueError(cursor)
+    except Exception:
+        raise InvalidPage('Некорректный курсор страницы.')
+    return direction, values
+
+
+def estimate_row_count(model, using='default'):
+    """Число строк таблицы по статистике СУБД или None, если её нет.
+
+    Для SQLite статистику собирает ANALYZE (таблица sqlite_stat1), для
+    PostgreSQL — autovacuum (pg_class.reltuples).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator без полного COUNT(*) по большим таблицам.
+
+    Для списка без фильтров число строк берётся из статистики СУБД, иначе
+    считается не больше count_limit + 1 строк. Если число строк не точное,
+    страницы дальше num_pages всё равно отдаются, пока в них есть строки,
+    а в ссылках за последней из них показывается следующая, если она не
+    пуста.
+    """
+
+    count_limit = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.count_limit:
+                self.count_is_exact = False
+                return estimate
+        count = queryset.order_by().values('pk')[
+            :self.count_limit + 1
+        ].count()
+        self.count_is_exact = count <= self.count_limit
+        return count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_is_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_is_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+        if number > 1 and not object_list:
+            raise EmptyPage('Страница пуста.')
+        return self._get_page(object_list, number, self)
+
+    def get_elided_page_range(self, number=1, **kwargs):
+        number = self.validate_number(number)
+        if self.count_is_exact or number < self.num_pages:
+            yield from super().get_elided_page_range(number, **kwargs)
+            return
+        yield from super().get_elided_page_range(self.num_pages, **kwargs)
+        if number - 1 > self.num_pages + 1:
+            yield self.ELLIPSIS
+        yield from range(max(self.num_pages + 1, number - 1), number + 1)
+        if self.object_list[number * self.per_page:].exists():
+            yield number + 1
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, берущий число объектов из кэша с тегами.
+
+    COUNT(*) по ленте выполняется один раз, пока не сброшен любой из
+    cache_tags или не истёк timeout; номера страниц выводятся как
+    обычно.
+    """
+
+    def __init__(self, object_list, per_page, cache_key, cache_tags,
+                 timeout, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.cache_tags = tuple(cache_tags)
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        count = get_tagged(self.cache_key)
+        if count is None:
+            count = self.object_list.count()
+            set_tagged(self.cache_key, self.cache_tags, count, self.timeout)
+        return count
+
+
+def filter_first(queryset, condition):
+    """queryset.filter(condition) с condition в начале WHERE.
+
+    Из нескольких верхних границ одного столбца SQLite ищет по индексу
+    только по первой, поэтому граница ключа страницы должна идти раньше
+    условий самого queryset, например pub_date <= now у ленты.
+    """
+    before = len(queryset.query.where.children)
+    queryset = queryset.filter(condition)
+    children = queryset.query.where.children
+    children[:] = children[before:] + children[:before]
+    return queryset
+
+
+class CursorPaginator:
+    """Постраничный вывод по ключу сортировки (keyset) без OFFSET и COUNT.
+
+    Страница выбирается условием «после/до ключа соседней записи», поэтому
+    стоимость любой страницы одинакова. Поля ordering должны однозначно
+    упорядочивать записи, последним обычно указывают первичный ключ.
+    """
+
+    cursor_mode = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            object_list.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj, direction):
+        return dump_cursor(
+            direction, [field.value_to_string(obj) for field in self.fields]
+        )
+
+    def decode_cursor(self, cursor):
+        direction, raw_values = load_cursor(cursor, len(self.fields))
+        try:
+            values = [field.to_python(value)
+                      for field, value in zip(self.fields, raw_values)]
+        except Exception:
+            raise InvalidPage('Некорректный курсор страницы.')
+        return direction, values
+
+    def _seek(self, values, backwards):
+        """Условие «после ключа values» в порядке обхода страницы.
+
+        Для (a, b) строится a <= X AND (a < X OR b < Y): нестрогое
+        условие на ведущий столбец даёт СУБД диапазон по индексу, а не
+        цепочку OR, которую SQLite читает с начала индекса.
+        """
+        condition = None
+        for name, field, value in reversed(list(
+                zip(self.ordering, self.fields, values))):
+            descending = name.startswith('-') != backwards
+            lookup = 'lt' if descending else 'gt'
+            strict = Q(**{f'{field.name}__{lookup}': value})
+            if condition is None:
+                condition = strict
+            else:
+                condition = Q(**{f'{field.name}__{lookup}e': value}) & (
+                    strict | condition
+                )
+        return condition
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+        backwards = direction == PREVIOUS
+        ordering = self.ordering
+        if backwards:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}'
+                        for name in ordering]
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = filter_first(queryset, self._seek(values, backwards))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True,
+                              has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more,
+                          has_previous=values is not None)
+
+
+class CursorPage(Sequence):
+    """Страница CursorPaginator с интерфейсом, близким к Page."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return self.paginator.encode_cursor(self.object_list[-1], NEXT)
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return self.paginator.encode_cursor(self.object_list[0],
+                                                PREVIOUS)
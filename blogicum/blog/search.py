@@ -0,0 +1,281 @@
+import math
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.db.models import (
+    Case, Count, F, FloatField, Q, Sum, Value, When
+)
+from django.db.models.expressions import RawSQL
+
+from blog.models import Post, PostTerm
+from blog.paginators import (
+    NEXT, PREVIOUS, CursorPage, dump_cursor, estimate_row_count,
+    load_cursor
+)
+from blog.stemmer import stem
+
+FTS_TABLE = 'blog_post_fts'
+TITLE_WEIGHT = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+DOCUMENT_COUNT_KEY = 'search:document_count'
+DOCUMENT_COUNT_TIMEOUT = 10 * 60
+
+WORD_RE = re.compile(r'\w+')
+CYRILLIC_RE = re.compile('[а-я]')
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'все', 'всё', 'да', 'для', 'до',
+    'же', 'за', 'и', 'из', 'или', 'к', 'как', 'ко', 'ли', 'на', 'над',
+    'не', 'ни', 'но', 'о', 'об', 'от', 'по', 'под', 'при', 'про', 'с',
+    'со', 'так', 'то', 'у', 'что', 'это',
+))
+
+
+def tokenize(text):
+    """Основы слов текста в порядке появления, без стоп-слов."""
+    terms = []
+    for word in WORD_RE.findall(text.lower().replace('ё', 'е')):
+        if word in STOP_WORDS:
+            continue
+        if CYRILLIC_RE.search(word):
+            word = stem(word)
+        if word:
+            terms.append(word[:MAX_TERM_LENGTH])
+    return terms
+
+
+def search_terms(query):
+    """Различные основы слов поискового запроса."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def document_count():
+    """Число постов для IDF: по статистике СУБД или COUNT(*) из кэша.
+
+    Точное значение для весов не нужно, поэтому COUNT(*) по всей таблице
+    выполняется не чаще раза в DOCUMENT_COUNT_TIMEOUT, а не на каждый
+    поисковый запрос.
+    """
+    count = estimate_row_count(Post)
+    if count is None:
+        cache = caches[settings.PAGE_CACHE]
+        count = cache.get(DOCUMENT_COUNT_KEY)
+        if count is None:
+            count = Post.objects.count()
+            cache.set(DOCUMENT_COUNT_KEY, count, DOCUMENT_COUNT_TIMEOUT)
+    return max(count, 1)
+
+
+class FTS5Index:
+    """Индекс в виртуальной таблице SQLite FTS5.
+
+    В таблицу пишутся уже приведённые к основам слова, поэтому запрос
+    ищет те же основы; ранжирование — bm25 с весом заголовка.
+    """
+
+    def index(self, posts):
+        posts = list(posts)
+        self.remove([post.pk for post in posts])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, body) '
+                'VALUES (%s, %s, %s)',
+                [(post.pk, ' '.join(tokenize(post.title)),
+                  ' '.join(tokenize(post.text))) for post in posts],
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(post_id,) for post_id in post_ids],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def matching(self, terms):
+        """Подзапрос id постов со всеми основами terms."""
+        return RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [self.match_expression(terms)],
+        )
+
+    @staticmethod
+    def match_expression(terms):
+        return ' '.join('"{}"'.format(term.replace('"', '""'))
+                        for term in terms)
+
+    def search(self, terms, visible, limit, after=None, backwards=False):
+        visible_sql, visible_params = (
+            visible.order_by().values('pk').query.sql_with_params()
+        )
+        params = [self.match_expression(terms), *visible_params]
+        seek = ''
+        if after is not None:
+            lookup = '>' if backwards else '<'
+            seek = (f'WHERE score {lookup} %s '
+                    f'OR (score = %s AND id {lookup} %s)')
+            params += [after[0], after[0], after[1]]
+        direction = 'ASC' if backwards else 'DESC'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, score FROM ('
+                f'SELECT rowid AS id, -bm25({FTS_TABLE}, '
+                f'{float(TITLE_WEIGHT)}, 1.0) AS score FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid IN ({visible_sql})'
+                f') {seek} ORDER BY score {direction}, id {direction} '
+                'LIMIT %s',
+                params + [limit],
+            )
+            return cursor.fetchall()
+
+
+class TableIndex:
+    """Обратный индекс в таблице PostTerm для любой базы данных.
+
+    Пост должен содержать все основы запроса; релевантность —
+    сумма weight * idf по основам запроса.
+    """
+
+    def index(self, posts):
+        posts = list(posts)
+        self.remove([post.pk for post in posts])
+        PostTerm.objects.bulk_create(
+            PostTerm(post_id=post.pk, term=term, weight=weight)
+            for post in posts
+            for term, weight in self.weights(post).items()
+        )
+
+    @staticmethod
+    def weights(post):
+        weights = Counter(tokenize(post.text))
+        for term in tokenize(post.title):
+            weights[term] += TITLE_WEIGHT
+        return weights
+
+    def remove(self, post_ids):
+        PostTerm.objects.filter(post_id__in=post_ids).delete()
+
+    def clear(self):
+        PostTerm.objects.all().delete()
+
+    def matching(self, terms):
+        """Подзапрос id постов со всеми основами terms."""
+        return PostTerm.objects.filter(term__in=terms).values(
+            'post_id'
+        ).annotate(matched=Count('term')).filter(
+            matched=len(terms)
+        ).values('post_id')
+
+    def search(self, terms, visible, limit, after=None, backwards=False):
+        frequencies = dict(
+            PostTerm.objects.filter(term__in=terms).values('term')
+            .annotate(posts=Count('post')).values_list('term', 'posts')
+        )
+        if len(frequencies) < len(terms):
+            return []
+        total = document_count()
+        score = Sum(Case(
+            *(When(term=term, then=F('weight') * Value(
+                math.log(1 + total / frequency)))
+              for term, frequency in frequencies.items()),
+            output_field=FloatField(),
+        ))
+        rows = PostTerm.objects.filter(
+            term__in=terms, post__in=visible.order_by().values('pk')
+        ).values('post_id').annotate(
+            matched=Count('term'), score=score
+        ).filter(matched=len(terms))
+        if after is not None:
+            lookup = 'gt' if backwards else 'lt'
+            rows = rows.filter(
+                Q(**{f'score__{lookup}': after[0]})
+                | Q(score=after[0], **{f'post_id__{lookup}': after[1]})
+            )
+        ordering = (
+            ('score', 'post_id') if backwards else ('-score', '-post_id')
+        )
+        return list(rows.order_by(*ordering).values_list(
+            'post_id', 'score')[:limit])
+
+
+BACKENDS = {'fts5': FTS5Index, 'table': TableIndex}
+_fts5_available = {}
+
+
+def fts5_available():
+    """Есть ли в базе таблица FTS5, созданная миграцией."""
+    name = connection.settings_dict['NAME']
+    if name not in _fts5_available:
+        _fts5_available[name] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_available[name]
+
+
+def get_search_index():
+    """Индекс поиска по настройке SEARCH_BACKEND."""
+    name = settings.SEARCH_BACKEND
+    if name == 'auto':
+        name = 'fts5' if fts5_available() else 'table'
+    return BACKENDS[name]()
+
+
+class SearchPaginator:
+    """Постраничный вывод результатов поиска по ключу (score, id).
+
+    Курсор хранит релевантность и id соседнего поста, так что каждая
+    страница — один запрос к индексу и один запрос за карточками.
+    """
+
+    cursor_mode = True
+
+    def __init__(self, query, object_list, per_page, search_index=None):
+        self.terms = search_terms(query)
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.search_index = search_index or get_search_index()
+
+    def encode_cursor(self, obj, direction):
+        return dump_cursor(direction, [obj.search_score, obj.pk])
+
+    def decode_cursor(self, cursor):
+        direction, values = load_cursor(cursor, 2)
+        try:
+            return direction, (float(values[0]), int(values[1]))
+        except (TypeError, ValueError):
+            raise InvalidPage('Некорректный курсор страницы.')
+
+    def page(self, cursor=None):
+        direction, after = NEXT, None
+        if cursor:
+            direction, after = self.decode_cursor(cursor)
+        if not self.terms:
+            return CursorPage([], self, has_next=False, has_previous=False)
+        backwards = direction == PREVIOUS
+        rows = self.search_index.search(
+            self.terms, self.object_list, self.per_page + 1,
+            after=after, backwards=backwards,
+        )
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        posts = self.object_list.in_bulk([post_id for post_id, _ in rows])
+        results = []
+        for post_id, score in rows:
+            if post_id in posts:
+                posts[post_id].search_score = score
+                results.append(posts[post_id])
+        if backwards:
+            return CursorPage(results, self, has_next=True,
+                              has_previous=has_more)
+        return CursorPage(results, self, has_next=has_more,
+                          has_previous=after is not None)
@@ -0,0 +1,253 @@
+import threading
+
+from django.db.models import Count, F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import (
+    ALL_PAGES_TAG, invalidate_pages, post_count_tags, post_page_tags
+)
+from blog.images import enqueue_renditions
+from blog.models import (
+    Category, Comment, Location, Post, User, make_excerpt
+)
+from blog.search import get_search_index
+from blog.stats import (
+    add_author_activity, remove_author_activity, remove_author_comments
+)
+from blog.utils import reset_next_publication
+
+# Поля автора, которые выводятся в карточках и на страницах постов.
+USER_DISPLAY_FIELDS = ('username', 'first_name', 'last_name')
+
+# Поля поста, от которых зависит, в какие ленты он входит.
+FEED_MEMBERSHIP_FIELDS = ('category_id', 'author_id', 'is_published',
+                          'pub_date')
+
+_deleting = threading.local()
+
+
+def deleting_post_ids():
+    """id постов, которые сейчас удаляются в этом потоке."""
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def is_cascade_delete(comment):
+    """Удаляется ли комментарий вместе со своим постом."""
+    return comment.post_id in deleting_post_ids()
+
+
+def invalidate_post_pages(post_id):
+    post = Post.objects.filter(pk=post_id).values_list(
+        'category_id', 'author_id'
+    ).first()
+    if post is not None:
+        invalidate_pages(*post_page_tags(post_id, *post))
+
+
+@receiver(pre_save, sender=Post)
+def fill_updated_at(sender, instance, raw=False, **kwargs):
+    """Заполняет updated_at у постов из фикстур, где этого поля нет."""
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def fill_excerpt(sender, instance, raw=False, **kwargs):
+    """Заполняет анонс у постов из фикстур: loaddata минует Post.save()."""
+    if raw and not instance.excerpt:
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def invalidate_previous_post_pages(sender, instance, raw=False, **kwargs):
+    """Сбрасывает страницы, где пост был виден до изменения.
+
+    Прежние ленты поста запоминаются для invalidate_feed_counts().
+    """
+    if raw or instance.pk is None:
+        return
+    previous = Post.objects.filter(pk=instance.pk).values_list(
+        *FEED_MEMBERSHIP_FIELDS
+    ).first()
+    if previous is not None:
+        instance._previous_feeds = previous
+        invalidate_pages(*post_page_tags(instance.pk, *previous[:2]))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_current_post_pages(sender, instance, raw=False, **kwargs):
+    """Сбрасывает страницы, где пост виден после изменения."""
+    if not raw:
+        reset_next_publication()
+        invalidate_pages(*post_page_tags(
+            instance.pk, instance.category_id, instance.author_id
+        ))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feed_counts(sender, instance, raw=False, **kwargs):
+    """Сбрасывает числа постов лент, только если состав лент изменился.
+
+    Новый и удалённый пост меняют свои ленты; при правке — только смена
+    категории, автора, публикации или даты. Наступление отложенной
+    публикации покрывает TTL числа до ближайшей публикации.
+    """
+    previous = instance.__dict__.pop('_previous_feeds', None)
+    if raw:
+        return
+    tags = post_count_tags(instance.category_id, instance.author_id)
+    if previous is not None:
+        current = tuple(
+            getattr(instance, field) for field in FEED_MEMBERSHIP_FIELDS
+        )
+        if current == previous:
+            return
+        tags += post_count_tags(*previous[:2])
+    invalidate_pages(*tags)
+
+
+@receiver(post_save, sender=Post)
+def queue_image_renditions(sender, instance, raw=False, **kwargs):
+    """Ставит в очередь уменьшенные копии изображения поста."""
+    if not raw and instance.image:
+        enqueue_renditions(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """Обновляет пост в индексе поиска, в том числе при loaddata."""
+    get_search_index().index([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Убирает удалённый пост из индекса поиска."""
+    get_search_index().remove([instance.pk])
+
+
+@receiver(pre_delete, sender=Post)
+def discount_post_comments(sender, instance, **kwargs):
+    """Списывает комментарии удаляемого поста у их авторов разом.
+
+    Комментарии уходят каскадом, и их обработчики post_delete пропускают
+    пост из deleting_post_ids(): счётчик самого поста и его страницы
+    больше не нужны, а статистика авторов уже уменьшена одним запросом.
+    """
+    counts = dict(
+        Comment.objects.filter(post=instance).order_by()
+        .values_list('author').annotate(total=Count('pk'))
+    )
+    remove_author_comments(counts)
+    invalidate_pages(*(f'profile:{user_id}' for user_id in counts))
+    deleting_post_ids().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    deleting_post_ids().discard(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_author_activity(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый пост или комментарий в статистике автора."""
+    if raw or not created:
+        return
+    field = 'post_count' if sender is Post else 'comment_count'
+    add_author_activity(instance.author_id, field, instance.created_at)
+    invalidate_pages(f'profile:{instance.author_id}')
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def discount_author_activity(sender, instance, **kwargs):
+    """Убирает удалённый пост или комментарий из статистики автора."""
+    if sender is Comment and is_cascade_delete(instance):
+        return
+    field = 'post_count' if sender is Post else 'comment_count'
+    remove_author_activity(instance.author_id, field)
+    invalidate_pages(f'profile:{instance.author_id}')
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличивает счётчик комментариев поста при создании комментария."""
+    if raw:
+        return
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1,
+            updated_at=timezone.now(),
+        )
+        invalidate_post_pages(instance.post_id)
+    else:
+        invalidate_pages(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста при удалении комментария."""
+    if is_cascade_delete(instance):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+    invalidate_post_pages(instance.post_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def touch_related_posts(sender, instance, raw=False, **kwargs):
+    """Продвигает версию постов, чьи карточки показывают этот объект.
+
+    Удаление обрабатывается до SET_NULL, пока связь с постами ещё есть.
+    """
+    if raw:
+        return
+    field = 'category' if sender is Category else 'location'
+    Post.objects.filter(**{field: instance}).update(
+        updated_at=timezone.now()
+    )
+    invalidate_pages(ALL_PAGES_TAG)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_display(sender, instance, raw=False, update_fields=None,
+                          **kwargs):
+    """Запоминает выводимые на страницах поля автора до изменения."""
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not (
+            set(update_fields) & set(USER_DISPLAY_FIELDS)):
+        return
+    instance._previous_display = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*USER_DISPLAY_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, raw=False, **kwargs):
+    """Сбрасывает страницы, только если изменилось имя автора.
+
+    Регистрация, вход, смена пароля или e-mail на страницах не видны и
+    кэш не трогают.
+    """
+    previous = instance.__dict__.pop('_previous_display', None)
+    if raw or created or previous is None:
+        return
+    current = tuple(getattr(instance, field) for field in USER_DISPLAY_FIELDS)
+    if current == previous:
+        return
+    Post.objects.filter(author=instance).update(updated_at=timezone.now())
+    invalidate_pages(ALL_PAGES_TAG)
@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, When
+from django.db.models.functions import Greatest
+
+from blog.models import AuthorStats, Comment, Post
+
+
+def compute_author_stats(user_ids):
+    """Статистика авторов, посчитанная заново по постам и комментариям."""
+    stats = {pk: AuthorStats(user_id=pk) for pk in user_ids}
+    for model, field in ((Post, 'post_count'), (Comment, 'comment_count')):
+        rows = model.objects.filter(author__in=stats).order_by().values(
+            'author').annotate(total=Count('pk'), last=Max('created_at'))
+        for row in rows:
+            author_stats = stats[row['author']]
+            setattr(author_stats, field, row['total'])
+            if (author_stats.last_activity is None
+                    or author_stats.last_activity < row['last']):
+                author_stats.last_activity = row['last']
+    return list(stats.values())
+
+
+def add_author_activity(user_id, field, at):
+    """Увеличивает счётчик автора и сдвигает дату последней активности.
+
+    Строки статистики ещё нет у авторов, зарегистрированных после
+    последней пересборки: тогда она считается целиком.
+    """
+    with transaction.atomic():
+        updated = AuthorStats.objects.filter(user_id=user_id).update(
+            **{field: F(field) + 1}, last_activity=at
+        )
+        if not updated:
+            AuthorStats.objects.bulk_create(
+                compute_author_stats([user_id]), ignore_conflicts=True
+            )
+
+
+def remove_author_activity(user_id, field):
+    """Уменьшает счётчик автора; дата последней активности не меняется."""
+    AuthorStats.objects.filter(user_id=user_id, **{f'{field}__gt': 0}).update(
+        **{field: F(field) - 1}
+    )
+
+
+def remove_author_comments(counts):
+    """Уменьшает счётчики комментариев нескольких авторов одним запросом.
+
+    counts — число удаляемых комментариев по id автора.
+    """
+    if not counts:
+        return
+    AuthorStats.objects.filter(user_id__in=counts).update(
+        comment_count=Greatest(Case(
+            *(When(user_id=user_id, then=F('comment_count') - total)
+              for user_id, total in counts.items()),
+            default=F('comment_count'),
+        ), 0)
+    )
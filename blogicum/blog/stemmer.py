@@ -0,0 +1,135 @@
+"""Стеммер русского языка по алгоритму Snowball (Портера).
+
+Окончания ищутся только в области RV — после первой гласной слова;
+словообразовательный суффикс -ост(ь) — только в области R2. Из окончаний
+одного класса выбирается самое длинное; окончания первой группы
+снимаются, только если перед ними стоит «а» или «я».
+"""
+from functools import lru_cache
+
+STEM_CACHE_SIZE = 1 << 16
+
+VOWELS = frozenset('аеиоуыэюя')
+GROUP1_PRECEDING = frozenset('ая')
+
+
+def _endings(*groups):
+    return sorted({ending for group in groups for ending in group},
+                  key=len, reverse=True)
+
+
+PERFECTIVE_GERUND_1 = ('в', 'вши', 'вшись')
+PERFECTIVE_GERUND_2 = ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись')
+ADJECTIVE = (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+REFLEXIVE = ('ся', 'сь')
+VERB_1 = (
+    'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+    'ют', 'ны', 'ть', 'ешь', 'нно',
+)
+VERB_2 = (
+    'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+    'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+    'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+)
+NOUN = (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+)
+DERIVATIONAL = ('ость', 'ост')
+SUPERLATIVE = ('ейше', 'ейш')
+
+CLASSES = {
+    'perfective_gerund': (_endings(PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2),
+                          frozenset(PERFECTIVE_GERUND_1)),
+    'adjective': (_endings(ADJECTIVE), frozenset()),
+    'participle': (_endings(PARTICIPLE_1, PARTICIPLE_2),
+                   frozenset(PARTICIPLE_1)),
+    'reflexive': (_endings(REFLEXIVE), frozenset()),
+    'verb': (_endings(VERB_1, VERB_2), frozenset(VERB_1)),
+    'noun': (_endings(NOUN), frozenset()),
+}
+
+
+def _regions(word):
+    """Начала областей RV и R2."""
+    rv = next((i + 1 for i, char in enumerate(word) if char in VOWELS),
+              len(word))
+    r1 = _region_after(word, 1)
+    r2 = _region_after(word, r1 + 1)
+    return rv, r2
+
+
+def _region_after(word, start):
+    for i in range(start, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _strip(word, rv, name):
+    """Снимает самое длинное окончание класса name в области RV.
+
+    Возвращает основу или None, если окончание не найдено либо для
+    окончания первой группы перед ним нет «а»/«я».
+    """
+    endings, group1 = CLASSES[name]
+    for ending in endings:
+        start = len(word) - len(ending)
+        if start >= rv and word.endswith(ending):
+            if ending in group1 and not (
+                    start - 1 >= rv and word[start - 1] in GROUP1_PRECEDING):
+                return None
+            return word[:start]
+    return None
+
+
+def _strip_inflection(word, rv):
+    """Шаг 1: деепричастие или возвратная частица и окончание."""
+    stemmed = _strip(word, rv, 'perfective_gerund')
+    if stemmed is not None:
+        return stemmed
+    word = _strip(word, rv, 'reflexive') or word
+    stemmed = _strip(word, rv, 'adjective')
+    if stemmed is not None:
+        return _strip(stemmed, rv, 'participle') or stemmed
+    return _strip(word, rv, 'verb') or _strip(word, rv, 'noun') or word
+
+
+def _tidy_up(word, rv):
+    """Шаг 4: превосходная степень, двойное «н» и мягкий знак."""
+    for ending in SUPERLATIVE:
+        if word.endswith(ending) and len(word) - len(ending) >= rv:
+            word = word[:-len(ending)]
+            break
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """Основа слова; слово должно быть в нижнем регистре.
+
+    Словарь текстов невелик, поэтому основы запоминаются: повторный
+    разбор слова в чистом Python обходится дороже поиска в кэше.
+    """
+    word = word.replace('ё', 'е')
+    rv, r2 = _regions(word)
+    word = _strip_inflection(word, rv)
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+    for ending in DERIVATIONAL:
+        if word.endswith(ending) and len(word) - len(ending) >= r2:
+            word = word[:-len(ending)]
+            break
+    return _tidy_up(word, rv)
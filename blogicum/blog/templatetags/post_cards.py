@@ -0,0 +1,23 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_post_card
+from blog.images import rendition_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка поста для лент с кэшированием фрагмента."""
+    return mark_safe(render_post_card(post))
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, sizes='(max-width: 640px) 100vw, 640px'):
+    """Изображение поста с srcset из уменьшенных копий."""
+    return {
+        'image': post.image,
+        'srcset': rendition_srcset(post.image),
+        'sizes': sizes,
+    }
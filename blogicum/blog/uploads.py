@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps
+
+# Параметры сохранения при перекодировании; GIF хранится как есть, чтобы
+# не потерять анимацию, метаданных EXIF в нём не бывает.
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+
+# Форматы, которые Pillow умеет уменьшать прямо при декодировании.
+DRAFT_FORMATS = ('JPEG',)
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл и обрывает её на max_size байт.
+
+    Файл сверх лимита не дочитывается ни в память, ни на диск; имя поля
+    попадает в rejected, чтобы форма показала понятную ошибку.
+    """
+
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size or settings.POST_IMAGE_MAX_UPLOAD_SIZE
+        self.rejected = {}
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.file.close()
+            self.rejected[self.field_name] = (
+                'Файл больше допустимых '
+                f'{filesizeformat(self.max_size)}.'
+            )
+            raise SkipFile()
+        return super().receive_data_chunk(raw_data, start)
+
+
+def read_image_header(upload):
+    """Проверяет формат и размеры изображения по заголовку файла.
+
+    Image.open() читает только заголовок, пиксели не декодируются.
+    Форматы без уменьшения при декодировании ограничены
+    POST_IMAGE_MAX_DECODED_PIXELS.
+    """
+    source = (upload.temporary_file_path()
+              if hasattr(upload, 'temporary_file_path') else upload)
+    try:
+        with Image.open(source) as image:
+            image_format, size = image.format, image.size
+    except Exception:
+        raise ValidationError(
+            'Загрузите правильное изображение.', code='invalid_image'
+        )
+    finally:
+        if hasattr(upload, 'seek'):
+            upload.seek(0)
+    if image_format not in settings.POST_IMAGE_FORMATS:
+        raise ValidationError(
+            f'Формат {image_format} не поддерживается.',
+            code='invalid_image',
+        )
+    max_pixels = settings.POST_IMAGE_MAX_PIXELS
+    if image_format in SAVE_OPTIONS and image_format not in DRAFT_FORMATS:
+        max_pixels = min(max_pixels, settings.POST_IMAGE_MAX_DECODED_PIXELS)
+    if size[0] * size[1] > max_pixels:
+        raise ValidationError(
+            'Слишком большое разрешение изображения.', code='invalid_image'
+        )
+    return image_format
+
+
+def recompress_image(upload):
+    """Перекодирует загрузку без EXIF, уменьшив до POST_IMAGE_MAX_SIDE.
+
+    Для JPEG декодер сразу уменьшает снимок кратно 1/2–1/8, поэтому в
+    памяти не оказывается полноразмерный кадр; результат пишется во
+    временный файл, а не в память. Повреждённое или обрезанное тело
+    файла поднимает OSError при декодировании.
+    """
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    with Image.open(upload) as original:
+        image_format = original.format
+        if image_format not in SAVE_OPTIONS:
+            upload.seek(0)
+            return upload
+        original.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        result = TemporaryUploadedFile(
+            upload.name, upload.content_type, 0, None
+        )
+        image.save(result, image_format, **SAVE_OPTIONS[image_format])
+    result.size = result.tell()
+    result.seek(0)
+    return result
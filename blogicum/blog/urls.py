@@ -7,12 +7,16 @@ app_name = 'blog'
 posts_urls = [
     path('create/', views.PostCreateView.as_view(),
          name='create_post'),
+    path('export/', views.export_posts,
+         name='export_posts'),
     path('<int:post_id>/', views.PostDetailView.as_view(),
          name='post_detail'),
     path('<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
     path('<int:post_id>/delete/', views.post_delete,
          name='delete_post'),
+    path('<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
     path('<int:post_id>/comment/', views.CommentCreateView.as_view(),
          name='add_comment'),
     path('<int:post_id>/edit_comment/<int:comment_id>/',
@@ -29,5 +33,6 @@ urlpatterns = [
     path('posts/', include(posts_urls)),
     path('category/<slug:category_slug>/',
          views.CategoryPostsListView.as_view(), name='category_posts'),
+    path('search/', views.SearchView.as_view(), name='search'),
     path('', views.PostListView.as_view(), name='index')
 ]
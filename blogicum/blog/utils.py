@@ -1,6 +1,22 @@
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
 from django.utils import timezone
 
+from blog.cache import local_value_timeout
 from blog.models import Post
+from blog.paginators import CursorPaginator
+
+NEXT_PUBLICATION_KEY = 'next_publication'
+NUM_COMMENTS = 50
+FEED_FIELDS = (
+    'title', 'excerpt', 'pub_date', 'image', 'is_published',
+    'comment_count', 'updated_at', 'author__username', 'location__name',
+    'location__is_published', 'category__title', 'category__slug',
+    'category__is_published',
+)
 
 
 def get_post_list():
@@ -12,3 +28,78 @@ def get_post_list():
         is_published=True,
         category__is_published=True
     )
+
+
+def only_feed_fields(queryset):
+    """Проекция постов для карточек ленты.
+
+    Загружаются только поля, которые выводит post_card.html; вместо
+    полного текста — сохранённый анонс excerpt.
+    """
+    return queryset.only(*FEED_FIELDS)
+
+
+def get_visible_post(user, post_id):
+    """Пост, если он опубликован или принадлежит user.
+
+    Видимость проверяется в самом запросе, поэтому для любого читателя
+    пост загружается одним запросом.
+    """
+    visible = Q(
+        pub_date__lte=timezone.now(),
+        is_published=True,
+        category__is_published=True
+    )
+    if user.is_authenticated:
+        visible |= Q(author_id=user.pk)
+    return Post.objects.select_related(
+        'author', 'location', 'category'
+    ).filter(visible).get(pk=post_id)
+
+
+def get_comment_page(post, cursor=None):
+    """Страница комментариев поста по курсору (created_at, id).
+
+    Длинные обсуждения не загружаются целиком: страница стоит один
+    запрос независимо от числа комментариев.
+    """
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        NUM_COMMENTS,
+        ordering=('created_at', 'id'),
+    )
+    return paginator.page(cursor)
+
+
+def get_next_publication():
+    """Ближайшая будущая дата публикации среди опубликованных постов.
+
+    До этого момента результат get_post_list() не может измениться сам
+    по себе, без правки данных. Значение кэшируется до изменения любого
+    поста или до наступления самой границы; None — отложенных нет.
+    В кэше процесса значение живёт не дольше PAGE_CACHE_LOCAL_TIMEOUT:
+    сброс из другого воркера до него не доходит.
+    """
+    cache = caches[settings.PAGE_CACHE]
+    now = timezone.now()
+    boundary = cache.get(NEXT_PUBLICATION_KEY, now)
+    if boundary is not None and boundary <= now:
+        boundary = Post.objects.filter(
+            is_published=True,
+            pub_date__gt=now,
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        cache.set(NEXT_PUBLICATION_KEY, boundary, local_value_timeout())
+    return boundary
+
+
+def reset_next_publication():
+    caches[settings.PAGE_CACHE].delete(NEXT_PUBLICATION_KEY)
+
+
+def get_feed_cache_timeout(timeout):
+    """TTL кэша над get_post_list(), не переходящий границу публикации."""
+    boundary = get_next_publication()
+    if boundary is None:
+        return timeout
+    remaining = math.ceil((boundary - timezone.now()).total_seconds())
+    return max(1, min(timeout, remaining))
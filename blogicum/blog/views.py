@@ -1,24 +1,72 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import InvalidPage
+from django.http import (
+    Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.response import TemplateResponse
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View
 )
 
 from blog.forms import CommentForm, PostForm
-from blog.mixins import CommentMixin, PostMixin
+from blog.cache import INDEX_TAG
+from blog.export import iter_posts_ndjson, parse_since, serialize_comment
+from blog.mixins import (
+    CommentMixin, ImageUploadMixin, PageCacheMixin, PostMixin
+)
 from blog.models import Category, Comment, Post, User
-from blog.utils import get_post_list
+from blog.search import SearchPaginator
+from blog.utils import (
+    get_comment_page, get_visible_post, only_feed_fields
+)
+
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff',
+    'stats__post_count', 'stats__comment_count', 'stats__last_activity',
+)
 
 
-class PostListView(PostMixin, ListView):
+class PostListView(PageCacheMixin, PostMixin, ListView):
     """Страница списка постов."""
 
     template_name = 'blog/index.html'
 
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (INDEX_TAG,)
+
+
+class SearchView(PageCacheMixin, PostMixin, ListView):
+    """Страница полнотекстового поиска по постам."""
+
+    template_name = 'blog/search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return super().get_queryset()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = SearchPaginator(self.query, queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['cursor_query'] = urlencode({'q': self.query}) + '&'
+        return context
+
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (INDEX_TAG,)
+
 
-class PostDetailView(DetailView):
+class PostDetailView(PageCacheMixin, DetailView):
     """Страница поста."""
 
     model = Post
@@ -26,27 +74,45 @@ class PostDetailView(DetailView):
     template_name = 'blog/detail.html'
 
     def get_object(self, queryset=None):
-        post = get_object_or_404(
-            Post.objects.select_related(
-                'author', 'location', 'category'
-            ),
-            pk=self.kwargs['post_id']
-        )
-        if post.author == self.request.user:
-            return post
-        return get_object_or_404(
-            get_post_list(),
-            pk=self.kwargs['post_id']
-        )
+        try:
+            return get_visible_post(self.request.user, self.kwargs['post_id'])
+        except Post.DoesNotExist:
+            raise Http404('Публикация не найдена.')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = get_comment_page(self.object)
         return context
 
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (f'post:{self.object.pk}',)
+
+
+class PostCommentsView(PageCacheMixin, View):
+    """Следующие страницы комментариев поста: HTML-фрагмент или JSON."""
+
+    template_name = 'includes/comment_list.html'
+
+    def get(self, request, post_id):
+        try:
+            post = get_visible_post(request.user, post_id)
+            page = get_comment_page(post, request.GET.get('cursor'))
+        except (Post.DoesNotExist, InvalidPage):
+            raise Http404('Комментарии не найдены.')
+        if request.GET.get('format') == 'json':
+            return JsonResponse({
+                'comments': [serialize_comment(comment) for comment in page],
+                'next_cursor': page.next_cursor,
+            })
+        return TemplateResponse(request, self.template_name,
+                                {'post': post, 'comments': page})
 
-class CategoryPostsListView(PostMixin, ListView):
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (f'post:{self.kwargs["post_id"]}',)
+
+
+class CategoryPostsListView(PageCacheMixin, PostMixin, ListView):
     """Страница списка категорий поста."""
 
     model = Category
@@ -66,8 +132,11 @@ class CategoryPostsListView(PostMixin, ListView):
         context['category'] = self.category
         return context
 
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (f'category:{self.category.pk}',)
 
-class ProfileListView(PostMixin, ListView):
+
+class ProfileListView(PageCacheMixin, PostMixin, ListView):
     """Страница профиля."""
 
     slug_url_kwarg = 'username'
@@ -75,19 +144,30 @@ class ProfileListView(PostMixin, ListView):
 
     def get_queryset(self):
         self.author = get_object_or_404(
-            User,
+            User.objects.select_related('stats').only(*PROFILE_FIELDS),
             username=self.kwargs['username']
         )
-        if self.author != self.request.user:
-            return super().get_queryset()
-        return Post.objects.select_related(
-            'author', 'location', 'category').filter(author=self.author)
+        if self.author == self.request.user:
+            queryset = only_feed_fields(Post.objects.select_related(
+                'author', 'location', 'category')).order_by('-pub_date')
+        else:
+            queryset = super().get_queryset()
+        return queryset.filter(author=self.author)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['profile'] = self.author
         return context
 
+    def get_cache_tags(self):
+        return super().get_cache_tags() + (f'profile:{self.author.pk}',)
+
+    def get_count_cache_key(self):
+        key = super().get_count_cache_key()
+        if self.author == self.request.user:
+            return f'{key}:own'
+        return key
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """Страница редактирования профиля."""
@@ -100,7 +180,7 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return self.request.user
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     """Страница создания поста."""
 
     model = Post
@@ -115,7 +195,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return reverse('blog:profile', args=[self.request.user])
 
 
-class PostUpdateView(LoginRequiredMixin, UpdateView):
+class PostUpdateView(ImageUploadMixin, LoginRequiredMixin, UpdateView):
     """Страница редактирования поста."""
 
     model = Post
@@ -168,3 +248,17 @@ class CommentDeleteView(CommentMixin, LoginRequiredMixin, DeleteView):
     """Страница удаления комментария поста."""
 
     success_url = reverse_lazy('blog:index')
+
+
+@login_required
+def export_posts(request):
+    """Потоковая выгрузка опубликованных постов в формате NDJSON."""
+    since = request.GET.get('since')
+    try:
+        since = parse_since(since) if since else None
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    return StreamingHttpResponse(
+        iter_posts_ndjson(since, with_comments='comments' in request.GET),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+if settings.WARM_TEMPLATES:
+    from core.warmup import warm_templates
+
+    warm_templates()
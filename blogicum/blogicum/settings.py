@@ -61,6 +61,9 @@ TEMPLATES = [
     },
 ]
 
+# Шаблоны виджетов форм кэшируются и при DEBUG, см. core.renderers.
+FORM_RENDERER = 'core.renderers.CachedTemplates'
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
@@ -114,3 +117,78 @@ STATICFILES_DIRS = [
 ]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Режим постраничного вывода лент: 'offset' — номера страниц,
+# 'cursor' — ссылки «вперёд/назад» по ключу (pub_date, id) без COUNT.
+POSTS_PAGINATION = 'offset'
+
+# Номера страниц в режиме 'offset': PAGINATION_WINDOW номеров по обе
+# стороны от текущей и PAGINATION_EDGES в начале и в конце ленты,
+# остальные заменяются многоточием.
+PAGINATION_WINDOW = 3
+
+PAGINATION_EDGES = 2
+
+# Кэш карточек версионирован по updated_at и безопасен в памяти каждого
+# процесса. Полностраничный кэш PAGE_CACHE хранит версии тегов и границу
+# ближайшей публикации: сброс из одного процесса виден остальным только в
+# общем бэкенде (Redis, memcached, база данных) — см. PAGE_CACHE_TIMEOUT.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'post_cards': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'post-cards',
+        'TIMEOUT': 60 * 60,
+    },
+}
+
+POST_CARD_CACHE = 'post_cards'
+
+# Полностраничный кэш для анонимных читателей. TTL дополнительно
+# ограничивается моментом ближайшей отложенной публикации. Долгий
+# PAGE_CACHE_TIMEOUT действует только для общего бэкенда; с кэшем в
+# памяти процесса (LocMemCache) другие воркеры не узнают о сбросе, и TTL
+# страниц и границы публикации не превышает PAGE_CACHE_LOCAL_TIMEOUT.
+PAGE_CACHE = 'default'
+
+PAGE_CACHE_TIMEOUT = 6 * 60 * 60
+
+PAGE_CACHE_LOCAL_TIMEOUT = 60
+
+# Ширины уменьшенных копий изображений постов для srcset.
+POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+# Ограничения загрузки изображений постов: размер файла, допустимые
+# форматы и число пикселей по заголовку; оригинал перекодируется без
+# EXIF с длинной стороной не больше POST_IMAGE_MAX_SIDE.
+POST_IMAGE_MAX_UPLOAD_SIZE = 15 * 1024 * 1024
+
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+POST_IMAGE_MAX_PIXELS = 50_000_000
+
+# PNG и WebP декодируются в полный кадр, без уменьшения при чтении, как
+# у JPEG, поэтому для них разрешение ограничено сильнее (~64 МБ в RGBA).
+POST_IMAGE_MAX_DECODED_PIXELS = 16_000_000
+
+POST_IMAGE_MAX_SIDE = 2560
+
+# Очередь фоновых задач core.Task, её выполняет manage.py run_worker.
+# TASKS_EAGER = True — выполнять задачу сразу после коммита в текущем
+# процессе, без воркера.
+TASKS_EAGER = False
+
+TASK_RETRY_DELAY = 30
+
+TASK_LOCK_TIMEOUT = 10 * 60
+
+# Разбирать все шаблоны при старте воркера; включено в
+# blogicum.settings_production вместе с кэширующим загрузчиком.
+WARM_TEMPLATES = False
+
+# Индекс полнотекстового поиска по постам: 'fts5' — таблица SQLite FTS5,
+# 'table' — обратный индекс в таблице PostTerm для любой базы, 'auto' —
+# FTS5, если миграция смогла её создать.
+SEARCH_BACKEND = 'auto'
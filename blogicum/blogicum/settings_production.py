@@ -0,0 +1,69 @@
+"""Настройки для продакшена поверх blogicum.settings.
+
+Использование: DJANGO_SETTINGS_MODULE=blogicum.settings_production,
+секретный ключ — в переменной окружения DJANGO_SECRET_KEY.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured(
+        'Задайте секретный ключ в переменной окружения DJANGO_SECRET_KEY.'
+    )
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+# Кэш страниц общий для всех воркеров и очереди задач, иначе сброс
+# тегов не доходит до других процессов. По умолчанию — таблица в базе
+# (manage.py createcachetable); для memcached задайте
+# DJANGO_CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache
+# и DJANGO_CACHE_LOCATION=host:port.
+CACHES = {
+    **CACHES,
+    'default': {
+        'BACKEND': os.environ.get(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.db.DatabaseCache',
+        ),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'page_cache'),
+    },
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app != 'debug_toolbar']
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('debug_toolbar.')
+]
+
+# Скомпилированные шаблоны хранятся в памяти процесса: с учётом
+# include-ов страница ленты без кэша разбирает десятки файлов на каждый
+# запрос. Загрузчики заданы явно, поэтому APP_DIRS выключен.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Разобрать все шаблоны при старте воркера (blogicum.wsgi), а не на
+# первых запросах после выкладки.
+WARM_TEMPLATES = True
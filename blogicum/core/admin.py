@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'status',
+        'attempts',
+        'run_after',
+        'finished_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('name', 'key')
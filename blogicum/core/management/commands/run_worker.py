@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import claim_tasks, fail_task, run_task
+from core.worker import execute, init_process
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в пуле процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int,
+                            default=os.cpu_count() or 1,
+                            help='Размер пула; 0 — выполнять задачи в '
+                                 'текущем процессе.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Пауза между опросами пустой очереди, с.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Завершиться, когда готовых задач не '
+                                 'останется.')
+
+    def handle(self, *args, processes, poll_interval, burst, **options):
+        self.statuses = Counter()
+        try:
+            if processes:
+                self.run_pool(processes, poll_interval, burst)
+            else:
+                self.run_inline(poll_interval, burst)
+        except KeyboardInterrupt:
+            pass
+        summary = ', '.join(
+            f'{status}: {count}'
+            for status, count in sorted(self.statuses.items())
+        )
+        self.stdout.write(f'Обработано задач — {summary or "нет"}.')
+
+    def run_inline(self, poll_interval, burst):
+        while True:
+            claimed = claim_tasks(1)
+            if not claimed:
+                if burst:
+                    return
+                time.sleep(poll_interval)
+                continue
+            self.statuses[run_task(claimed[0])] += 1
+
+    def run_pool(self, processes, poll_interval, burst):
+        """Выполняет задачи в пуле процессов.
+
+        Если процесс пула погиб (например, его убил OOM killer), пул
+        ломается целиком: его задачи завершаются ошибкой с повтором, а
+        пул создаётся заново.
+        """
+        while True:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_process,
+            ) as pool:
+                if self.serve(pool, processes, poll_interval, burst):
+                    return
+            self.stderr.write('Пул процессов сломан, создаём новый.')
+
+    def serve(self, pool, processes, poll_interval, burst):
+        """Раздаёт задачи пулу; False, если пул сломался."""
+        running = {}
+        while True:
+            claimed = claim_tasks(processes - len(running))
+            for index, task_id in enumerate(claimed):
+                try:
+                    running[pool.submit(execute, task_id)] = task_id
+                except BrokenProcessPool as error:
+                    for lost_id in claimed[index:]:
+                        self.fail(lost_id, error)
+                    self.collect(running, list(running))
+                    return False
+            if not running:
+                if burst:
+                    return True
+                time.sleep(poll_interval)
+                continue
+            done, _ = wait(running, timeout=poll_interval,
+                           return_when=FIRST_COMPLETED)
+            if not self.collect(running, done):
+                self.collect(running, list(running))
+                return False
+
+    def collect(self, running, futures):
+        """Учитывает завершённые futures; False, если пул сломан."""
+        healthy = True
+        for future in futures:
+            task_id = running.pop(future)
+            try:
+                self.statuses[future.result()] += 1
+            except BrokenProcessPool as error:
+                healthy = False
+                self.fail(task_id, error)
+            except Exception as error:
+                # Задача останется в работе и вернётся в очередь
+                # по TASK_LOCK_TIMEOUT.
+                self.stderr.write(f'Задача {task_id}: {error!r}')
+        return healthy
+
+    def fail(self, task_id, error):
+        self.statuses[fail_task(task_id, repr(error))] += 1
+        self.stderr.write(f'Задача {task_id}: {error!r}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+
+from core.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = ('Разбирает все шаблоны проекта: проверка перед выкладкой и '
+            'время разбора каждого шаблона.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10,
+                            help='Сколько самых медленных шаблонов вывести.')
+
+    def handle(self, *args, top, **options):
+        try:
+            timings = warm_templates()
+        except TemplateSyntaxError as error:
+            raise CommandError(f'Ошибка в шаблоне: {error}')
+        slowest = sorted(timings.items(), key=lambda item: item[1],
+                         reverse=True)[:top]
+        for name, elapsed in slowest:
+            self.stdout.write(f'{elapsed:>9.2f}ms  {name}')
+        self.stdout.write(
+            f'Разобрано шаблонов: {len(timings)} '
+            f'за {sum(timings.values()):.2f}ms.'
+        )
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class PublishedCreatedModel(models.Model):
@@ -15,3 +16,56 @@ class PublishedCreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Task(models.Model):
+    """Фоновая задача очереди в базе данных."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Функция', max_length=200)
+    kwargs = models.JSONField('Аргументы', default=dict)
+    key = models.CharField(
+        'Ключ идемпотентности',
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Повторная постановка задачи с тем же ключом '
+                  'игнорируется.'
+    )
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=3
+    )
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'задача'
+        verbose_name_plural = 'Задачи'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='task_status_run_after_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
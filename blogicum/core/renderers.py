@@ -0,0 +1,28 @@
+from django.forms.renderers import ROOT, DjangoTemplates
+from django.utils.functional import cached_property
+
+
+class CachedTemplates(DjangoTemplates):
+    """Рендерер форм, кэширующий шаблоны виджетов и при DEBUG.
+
+    Стандартный рендерер при DEBUG разбирает шаблон заново для каждого
+    виджета: список постов в админке со ста строками list_editable
+    разбирает больше тысячи шаблонов. Шаблоны виджетов берутся из Django
+    и приложений и при разработке не меняются.
+    """
+
+    @cached_property
+    def engine(self):
+        return self.backend({
+            'APP_DIRS': False,
+            'DIRS': [ROOT / self.backend.app_dirname],
+            'NAME': 'djangoforms',
+            'OPTIONS': {
+                'loaders': [
+                    ('django.template.loaders.cached.Loader', [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ]),
+                ],
+            },
+        })
@@ -0,0 +1,135 @@
+import traceback
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.models import Task
+
+
+def task(func):
+    """Делает функцию фоновой задачей: func.enqueue(key=..., **kwargs).
+
+    Задача хранится по пути импорта функции, аргументы должны
+    сериализоваться в JSON; имя key занято ключом идемпотентности.
+    """
+    name = f'{func.__module__}.{func.__qualname__}'
+
+    @wraps(func)
+    def enqueue(key=None, **kwargs):
+        return enqueue_task(name, kwargs, key=key)
+
+    func.enqueue = enqueue
+    return func
+
+
+def enqueue_task(name, kwargs, key=None):
+    """Ставит задачу в очередь после коммита текущей транзакции.
+
+    Если транзакция откатится, задача не появится. Задача с уже
+    известным ключом key, в том числе выполненная или ошибочная, не
+    создаётся повторно: ключ проверяется заранее, чтобы частые вызовы
+    (например, при каждом показе страницы) не пытались вставить строку.
+    При TASKS_EAGER задача выполняется сразу после коммита в текущем
+    процессе.
+    """
+    if key is not None and Task.objects.filter(key=key).exists():
+        return
+
+    def create():
+        try:
+            with transaction.atomic():
+                created = Task.objects.create(name=name, kwargs=kwargs,
+                                              key=key)
+        except IntegrityError:
+            return
+        if settings.TASKS_EAGER and claim_task(created.pk, timezone.now()):
+            run_task(created.pk)
+
+    transaction.on_commit(create)
+
+
+def claim_task(task_id, now):
+    """Переводит задачу из очереди в работу и засчитывает ей попытку.
+
+    Задача достаётся тому процессу, чей UPDATE со статусом PENDING в
+    условии изменил строку. Возвращает True, если задачу взял он.
+    """
+    return bool(Task.objects.filter(pk=task_id, status=Task.PENDING).update(
+        status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1
+    ))
+
+
+def claim_tasks(limit):
+    """Переводит до limit готовых задач в работу и возвращает их id.
+
+    Попытка засчитывается при взятии, поэтому задача, которая роняет
+    процесс или зависает дольше TASK_LOCK_TIMEOUT, не берётся бесконечно:
+    исчерпав max_attempts, она помечается ошибочной.
+    """
+    now = timezone.now()
+    expired = Task.objects.filter(
+        status=Task.RUNNING,
+        locked_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT),
+    )
+    expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, locked_at=None, finished_at=now,
+        last_error='Задача не завершилась за TASK_LOCK_TIMEOUT.',
+    )
+    expired.update(status=Task.PENDING, locked_at=None)
+    candidates = Task.objects.filter(
+        status=Task.PENDING, run_after__lte=now
+    ).values_list('pk', flat=True)[:limit]
+    return [pk for pk in candidates if claim_task(pk, now)]
+
+
+def _finish(task, error=None):
+    """Сохраняет итог попытки взятой задачи и возвращает её статус.
+
+    При ошибке задача повторяется с паузой TASK_RETRY_DELAY * 2 ** попытка,
+    пока не исчерпаны max_attempts.
+    """
+    if error is None:
+        task.status = Task.DONE
+        task.finished_at = timezone.now()
+    else:
+        task.last_error = error
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+            task.finished_at = timezone.now()
+        else:
+            task.status = Task.PENDING
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            )
+    task.locked_at = None
+    task.save(update_fields=(
+        'status', 'run_after', 'locked_at', 'last_error', 'finished_at',
+    ))
+    return task.status
+
+
+def run_task(task_id):
+    """Выполняет взятую задачу; при ошибке планирует повтор с паузой.
+
+    Возвращает итоговый статус задачи.
+    """
+    task = Task.objects.get(pk=task_id)
+    try:
+        import_string(task.name)(**task.kwargs)
+    except Exception:
+        return _finish(task, traceback.format_exc())
+    return _finish(task)
+
+
+def fail_task(task_id, error):
+    """Завершает попытку взятой задачи ошибкой, не выполняя её.
+
+    Нужна, если процесс, выполнявший задачу, погиб. Возвращает итоговый
+    статус задачи.
+    """
+    return _finish(Task.objects.get(pk=task_id), error)
@@ -0,0 +1,47 @@
+import time
+from pathlib import Path
+
+from django.template import engines
+from django.template.autoreload import is_django_path
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def template_names(engine):
+    """Имена шаблонов из каталогов загрузчиков движка, кроме самого Django.
+
+    Шаблоны админки и встроенных приложений Django в горячем пути сайта
+    не участвуют и не прогреваются.
+    """
+    names = set()
+    for loader in engine.template_loaders:
+        for directory in getattr(loader, 'get_dirs', list)():
+            root = Path(directory)
+            if is_django_path(root) or not root.is_dir():
+                continue
+            names.update(
+                path.relative_to(root).as_posix()
+                for path in root.rglob('*')
+                if path.suffix in TEMPLATE_SUFFIXES and path.is_file()
+            )
+    return sorted(names)
+
+
+def warm_templates():
+    """Разбирает все шаблоны проекта, заполняя кэширующий загрузчик.
+
+    Вызывается при старте воркера (WARM_TEMPLATES), чтобы первые
+    запросы после выкладки не разбирали шаблоны. Возвращает время
+    разбора каждого шаблона в миллисекундах; ошибка синтаксиса в
+    любом шаблоне поднимается сразу.
+    """
+    timings = {}
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            started = time.perf_counter()
+            backend.engine.get_template(name)
+            timings[name] = (time.perf_counter() - started) * 1000
+    return timings
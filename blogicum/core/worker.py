@@ -0,0 +1,20 @@
+"""Точки входа процессов run_worker.
+
+Процессы пула запускаются методом spawn и не наследуют соединения с
+базой родителя, поэтому модуль не импортирует модели до django.setup().
+"""
+
+
+def init_process():
+    import django
+
+    django.setup()
+
+
+def execute(task_id):
+    from django.db import close_old_connections
+
+    from core.tasks import run_task
+
+    close_old_connections()
+    return run_task(task_id)
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,18 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_tasks(settings):
+    settings.TASKS_EAGER = True
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -92,6 +105,8 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.budgets",
+    "fixtures.media",
     "adapters.comment",
 ]
 
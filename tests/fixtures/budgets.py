@@ -0,0 +1,79 @@
+import time
+import traceback
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from typing import NamedTuple
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+PROJECT_DIR = Path(settings.BASE_DIR).resolve()
+SQL_PREVIEW_LEN = 200
+
+
+class Budget(NamedTuple):
+    max_queries: int
+    max_ms: float
+
+
+def _call_site():
+    """Ближайший к запросу кадр стека из кода проекта."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        path = Path(frame.filename).resolve()
+        if PROJECT_DIR in path.parents:
+            relative = path.relative_to(PROJECT_DIR)
+            return f"{relative}:{frame.lineno} in {frame.name}"
+    return "<вне кода проекта>"
+
+
+def _format_report(name, budget, queries, elapsed_ms):
+    by_site = defaultdict(list)
+    for site, sql in queries:
+        by_site[site].append(sql)
+    lines = [
+        f"`{name}`: {len(queries)} SQL-запросов за {elapsed_ms:.0f} мс "
+        f"(бюджет: {budget.max_queries} запросов, {budget.max_ms:.0f} мс).",
+        "Запросы по местам вызова:",
+    ]
+    for site, statements in sorted(
+        by_site.items(), key=lambda item: -len(item[1])
+    ):
+        lines.append(f"  {len(statements)} × {site}")
+        for sql, repeats in Counter(statements).most_common():
+            lines.append(f"      [{repeats}] {sql[:SQL_PREVIEW_LEN]}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_budget(name, budget):
+    """Падает, если код внутри блока превысил бюджет запросов или времени.
+
+    В отчёт попадают выполненные запросы, сгруппированные по месту вызова
+    в коде проекта, — так N+1 сразу видно по строке шаблона или view.
+    """
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append((_call_site(), sql))
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    with connection.execute_wrapper(record):
+        yield
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if len(queries) > budget.max_queries or elapsed_ms > budget.max_ms:
+        pytest.fail(
+            _format_report(name, budget, queries, elapsed_ms), pytrace=False
+        )
+
+
+@pytest.fixture
+def seeded_blog(db):
+    call_command(
+        "seed_blog", users=10, posts=150, comments=600, seed=1,
+        stdout=StringIO(),
+    )
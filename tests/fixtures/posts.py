@@ -18,6 +18,18 @@ from conftest import (
 )
 
 
+@pytest.fixture
+def post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        location=None,
+        pub_date=datetime.now(tz=pytz.UTC) - timedelta(days=1),
+    )
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
@@ -0,0 +1,132 @@
+import re
+
+import pytest
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.forms import CheckboxInput
+from django.test.utils import CaptureQueriesContext
+
+from blog import paginators
+from blog.admin import PREVIEW_LENGTH, CommentAdmin
+from blog.models import Comment, Post
+from blog.paginators import EstimatedCountPaginator
+from core.renderers import CachedTemplates
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = "слово " * 100
+
+
+def changelist_queries(admin_client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, params)
+    assert response.status_code == 200
+    return response, [query["sql"] for query in queries]
+
+
+@pytest.mark.parametrize(
+    "url, model",
+    [("/admin/blog/post/", "blog.Post"),
+     ("/admin/blog/comment/", "blog.Comment")],
+)
+def test_changelist_queries_do_not_grow(admin_client, mixer, url, model):
+    mixer.cycle(3).blend(model, text=LONG_TEXT)
+    _, few = changelist_queries(admin_client, url)
+    mixer.cycle(12).blend(model, text=LONG_TEXT)
+    _, many = changelist_queries(admin_client, url)
+    assert len(many) == len(few), (
+        "Убедитесь, что число запросов списка в админке не зависит от "
+        "числа строк на странице."
+    )
+
+
+def test_changelist_truncates_text_in_sql(admin_client, mixer):
+    mixer.blend("blog.Comment", text=LONG_TEXT)
+    response, queries = changelist_queries(
+        admin_client, "/admin/blog/comment/"
+    )
+    comment = response.context["cl"].result_list[0]
+    assert len(comment.text_preview) == PREVIEW_LENGTH + 1
+    assert f"{comment.text_preview[:PREVIEW_LENGTH].rstrip()}…</a>" in (
+        response.content.decode()
+    ), "Убедитесь, что длинный текст в списке обрезается с многоточием."
+    assert not any(
+        '."text"' in re.sub(r"SUBSTR\([^)]*\)", "", sql) for sql in queries
+    ), "Убедитесь, что список комментариев не загружает полные тексты."
+
+
+def test_post_search_uses_index(admin_client, mixer):
+    found = mixer.blend("blog.Post", title="Прогулка по лесу")
+    mixer.blend("blog.Post", title="Поездка к морю")
+    response, queries = changelist_queries(
+        admin_client, "/admin/blog/post/", q="прогулки лес"
+    )
+    assert [post.pk for post in response.context["cl"].result_list] == [
+        found.pk
+    ], "Убедитесь, что поиск в админке идёт по индексу поиска."
+    assert not any("LIKE" in sql for sql in queries), (
+        "Убедитесь, что поиск в админке не использует LIKE '%…%'."
+    )
+
+
+def test_estimated_count_uses_statistics(monkeypatch, mixer):
+    mixer.cycle(3).blend("blog.Post")
+    monkeypatch.setattr(
+        paginators, "estimate_row_count", lambda model, using: 1_000_000
+    )
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == (
+        1_000_000
+    ), "Убедитесь, что для списка без фильтров берётся оценка СУБД."
+    assert EstimatedCountPaginator(
+        Post.objects.filter(pk__gt=0), 10
+    ).count == 3
+
+
+def test_estimated_count_is_capped(monkeypatch, mixer):
+    mixer.cycle(5).blend("blog.Comment")
+    monkeypatch.setattr(EstimatedCountPaginator, "count_limit", 2)
+    assert EstimatedCountPaginator(Comment.objects.all(), 10).count == 3, (
+        "Убедитесь, что без статистики COUNT ограничен count_limit."
+    )
+
+
+def test_pages_past_capped_count_are_served(monkeypatch, mixer):
+    mixer.cycle(5).blend("blog.Comment")
+    monkeypatch.setattr(EstimatedCountPaginator, "count_limit", 2)
+    paginator = EstimatedCountPaginator(Comment.objects.order_by("pk"), 2)
+    assert paginator.num_pages == 2
+    assert len(paginator.page(3)) == 1, (
+        "Убедитесь, что при неточном числе строк страницы дальше "
+        "num_pages отдаются."
+    )
+    with pytest.raises(EmptyPage):
+        paginator.page(4)
+    assert list(paginator.get_elided_page_range(2)) == [1, 2, 3], (
+        "Убедитесь, что за num_pages показывается ссылка на следующую "
+        "страницу."
+    )
+    assert list(paginator.get_elided_page_range(3)) == [1, 2, 3]
+
+
+def test_admin_serves_pages_past_capped_count(
+    monkeypatch, admin_client, mixer
+):
+    mixer.cycle(5).blend("blog.Comment")
+    monkeypatch.setattr(EstimatedCountPaginator, "count_limit", 2)
+    monkeypatch.setattr(CommentAdmin, "list_per_page", 2)
+    response, _ = changelist_queries(
+        admin_client, "/admin/blog/comment/", p=3
+    )
+    assert len(response.context["cl"].result_list) == 1, (
+        "Убедитесь, что дальние страницы админки не сбрасываются на первую."
+    )
+
+
+def test_form_renderer_caches_widget_templates(settings):
+    settings.DEBUG = True
+    renderer = CachedTemplates()
+    CheckboxInput().render("is_published", True, renderer=renderer)
+    loader, = renderer.engine.engine.template_loaders
+    assert "django/forms/widgets/checkbox.html" in (
+        loader.get_template_cache
+    ), "Убедитесь, что шаблоны виджетов кэшируются и при DEBUG."
@@ -0,0 +1,138 @@
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import AuthorStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stats_of(user):
+    stats = AuthorStats.objects.get(user=user)
+    return stats.post_count, stats.comment_count
+
+
+def test_stats_follow_posts_and_comments(mixer, user, another_user):
+    posts = mixer.cycle(3).blend("blog.Post", author=user)
+    comment = mixer.blend("blog.Comment", post=posts[0], author=another_user)
+    mixer.blend("blog.Comment", post=posts[1], author=user)
+    assert stats_of(user) == (3, 1), (
+        "Убедитесь, что статистика автора учитывает новые посты "
+        "и комментарии."
+    )
+    assert stats_of(another_user) == (0, 1)
+    assert (
+        AuthorStats.objects.get(user=another_user).last_activity
+        == comment.created_at
+    ), "Убедитесь, что дата последней активности обновляется."
+    posts[0].delete()
+    assert stats_of(user) == (2, 1), (
+        "Убедитесь, что удаление поста уменьшает число публикаций автора."
+    )
+    assert stats_of(another_user) == (0, 0), (
+        "Убедитесь, что удаление поста вместе с комментариями уменьшает "
+        "число комментариев их авторов."
+    )
+
+
+def delete_queries(post):
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    return len(queries)
+
+
+def test_post_delete_discounts_comments_in_bulk(
+    mixer, user, another_user
+):
+    few, many = mixer.cycle(2).blend("blog.Post", author=user)
+    mixer.cycle(2).blend("blog.Comment", post=few, author=another_user)
+    mixer.cycle(20).blend("blog.Comment", post=many, author=another_user)
+    mixer.cycle(10).blend("blog.Comment", post=many, author=user)
+    few_queries = delete_queries(few)
+    assert stats_of(another_user) == (0, 20)
+    assert delete_queries(many) == few_queries, (
+        "Убедитесь, что число запросов при удалении поста не зависит от "
+        "числа его комментариев."
+    )
+    assert stats_of(user) == (0, 0)
+    assert stats_of(another_user) == (0, 0), (
+        "Убедитесь, что удаление поста уменьшает число комментариев "
+        "их авторов."
+    )
+
+
+def test_user_delete_cascade(mixer, user, another_user):
+    own_post = mixer.blend("blog.Post", author=user)
+    other_post = mixer.blend("blog.Post", author=another_user)
+    mixer.cycle(3).blend("blog.Comment", post=other_post, author=user)
+    mixer.cycle(2).blend("blog.Comment", post=own_post, author=user)
+    mixer.cycle(4).blend("blog.Comment", post=other_post,
+                         author=another_user)
+    mixer.blend("blog.Comment", post=own_post, author=another_user)
+    another_user.delete()
+    assert stats_of(user) == (1, 2), (
+        "Убедитесь, что каскадное удаление постов автора списывает "
+        "комментарии к ним у других авторов."
+    )
+    own_post.refresh_from_db()
+    assert own_post.comment_count == 2, (
+        "Убедитесь, что удаление комментариев автора уменьшает счётчики "
+        "чужих постов."
+    )
+
+
+def test_recount_comments_repairs_drift(mixer, user):
+    posts = mixer.cycle(3).blend("blog.Post", author=user)
+    mixer.cycle(2).blend("blog.Comment", post=posts[0], author=user)
+    Post.objects.filter(pk=posts[0].pk).update(comment_count=7)
+    Post.objects.filter(pk=posts[1].pk).update(comment_count=1)
+    output = StringIO()
+    call_command("recount_comments", batch_size=2, stdout=output)
+    assert list(
+        Post.objects.order_by("pk").values_list("comment_count", flat=True)
+    ) == [2, 0, 0], (
+        "Убедитесь, что команда recount_comments исправляет счётчики "
+        "комментариев."
+    )
+    assert "Проверено постов: 3, исправлено: 2." in output.getvalue()
+
+
+def test_rebuild_matches_incremental(mixer, user, another_user):
+    posts = mixer.cycle(4).blend("blog.Post", author=user)
+    mixer.cycle(5).blend("blog.Comment", post=posts[0], author=another_user)
+    posts[1].delete()
+    expected = list(AuthorStats.objects.order_by("pk").values())
+    AuthorStats.objects.all().delete()
+    call_command("rebuild_author_stats", stdout=StringIO())
+    assert list(AuthorStats.objects.order_by("pk").values()) == expected, (
+        "Убедитесь, что команда rebuild_author_stats восстанавливает "
+        "ту же статистику, что ведут сигналы."
+    )
+
+
+def test_profile_shows_stats_without_aggregates(client, mixer, user):
+    mixer.cycle(2).blend("blog.Post", author=user)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("blog:profile", args=[user.username]))
+    assert "Публикаций: 2" in response.content.decode(), (
+        "Убедитесь, что в шапке профиля выводится число публикаций автора."
+    )
+    assert not any(
+        "blog_comment" in query["sql"] for query in queries
+    ), (
+        "Убедитесь, что статистика профиля не считается запросами "
+        "к комментариям."
+    )
+
+
+def test_migration_uses_swappable_user_model(settings):
+    migration = import_module("blog.migrations.0008_author_stats").Migration
+    assert any(
+        getattr(dependency, "setting", None) == settings.AUTH_USER_MODEL
+        for dependency in migration.dependencies
+    ), "Убедитесь, что миграция зависит от settings.AUTH_USER_MODEL."
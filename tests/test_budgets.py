@@ -0,0 +1,64 @@
+import pytest
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from blog.models import Category, Post, User
+from blog.utils import get_post_list
+from fixtures.budgets import Budget, assert_budget
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures("seeded_blog")]
+
+# Максимум SQL-запросов и миллисекунд на один рендер страницы с холодными
+# кэшами. Анонимная страница включает запрос ближайшей отложенной
+# публикации для срока жизни кэша; для авторизованного читателя вместо
+# него добавляются запросы сессии и пользователя. Ленты запрашивают
+# ближайшую публикацию и для авторизованного: по ней истекает кэш числа
+# постов.
+VIEW_BUDGETS = {
+    "blog:index": Budget(max_queries=3, max_ms=1500),
+    "blog:post_detail": Budget(max_queries=3, max_ms=1500),
+    "blog:category_posts": Budget(max_queries=4, max_ms=1500),
+    "blog:profile": Budget(max_queries=4, max_ms=1500),
+}
+AUTH_EXTRA_QUERIES = {"blog:post_detail": 1}
+AUTH_FEED_EXTRA_QUERIES = 2
+
+
+def budget_url(url_name):
+    post = get_post_list().order_by("-comment_count").first()
+    if url_name == "blog:post_detail":
+        return reverse(url_name, args=[post.id])
+    if url_name == "blog:category_posts":
+        category = Category.objects.filter(is_published=True).annotate(
+            total=Count("posts")
+        ).order_by("-total").first()
+        return reverse(url_name, args=[category.slug])
+    if url_name == "blog:profile":
+        author = User.objects.annotate(total=Count("posts")).order_by(
+            "-total"
+        ).first()
+        return reverse(url_name, args=[author.username])
+    return reverse(url_name)
+
+
+@pytest.mark.parametrize("url_name", VIEW_BUDGETS)
+def test_anonymous_view_budget(url_name):
+    url = budget_url(url_name)
+    with assert_budget(url_name, VIEW_BUDGETS[url_name]):
+        response = Client().get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("url_name", VIEW_BUDGETS)
+def test_author_view_budget(url_name):
+    url = budget_url(url_name)
+    client = Client()
+    client.force_login(Post.objects.order_by("-comment_count").first().author)
+    budget = VIEW_BUDGETS[url_name]
+    budget = budget._replace(max_queries=budget.max_queries
+                             + AUTH_EXTRA_QUERIES.get(
+                                 url_name, AUTH_FEED_EXTRA_QUERIES))
+    with assert_budget(url_name, budget):
+        response = client.get(url)
+    assert response.status_code == 200
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+from django.urls import reverse
+
+from blog.utils import NUM_COMMENTS
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = NUM_COMMENTS * 2 + 5
+MORE_RE = re.compile(r'href="([^"]+\?cursor=[\w-]+)"')
+
+
+@pytest.fixture
+def comments(mixer, user, post):
+    return mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post, author=user, text="Комментарий"
+    )
+
+
+def test_detail_shows_first_comment_page(client, post, comments):
+    response = client.get(reverse("blog:post_detail", args=[post.id]))
+    page = response.context["comments"]
+    assert [comment.id for comment in page] == [
+        comment.id for comment in comments[:NUM_COMMENTS]
+    ], (
+        "Убедитесь, что на странице поста выводится только первая страница "
+        "комментариев в порядке их добавления."
+    )
+    assert MORE_RE.search(response.content.decode()), (
+        "Убедитесь, что на странице поста есть ссылка для загрузки "
+        "следующих комментариев."
+    )
+
+
+def test_comment_pages_cover_all_comments(client, post, comments):
+    url = reverse("blog:post_comments", args=[post.id])
+    first = client.get(reverse("blog:post_detail", args=[post.id]))
+    seen = [comment.id for comment in first.context["comments"]]
+    cursor = first.context["comments"].next_cursor
+    while cursor:
+        data = client.get(url, {"cursor": cursor, "format": "json"}).json()
+        seen.extend(comment["id"] for comment in data["comments"])
+        cursor = data["next_cursor"]
+    assert seen == [comment.id for comment in comments], (
+        "Убедитесь, что страницы комментариев вместе содержат каждый "
+        "комментарий ровно один раз."
+    )
+
+
+def test_comment_fragment(client, post, comments):
+    detail = client.get(reverse("blog:post_detail", args=[post.id]))
+    next_url = MORE_RE.search(detail.content.decode()).group(1)
+    response = client.get(next_url.replace("&amp;", "&"))
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert f'name="comment_{comments[NUM_COMMENTS].id}"' in content, (
+        "Убедитесь, что фрагмент содержит следующую страницу комментариев."
+    )
+    assert "<html" not in content, (
+        "Убедитесь, что следующая страница комментариев отдаётся фрагментом "
+        "без базового шаблона."
+    )
+
+
+def test_comments_not_found(client, post, comments):
+    url = reverse("blog:post_comments", args=[post.id])
+    assert client.get(url, {"cursor": "bad"}).status_code == 404, (
+        "Убедитесь, что некорректный курсор комментариев приводит к "
+        "ошибке 404."
+    )
+    post.is_published = False
+    post.save()
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что комментарии снятого с публикации поста недоступны "
+        "другим пользователям."
+    )
@@ -0,0 +1,110 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog.mixins import PostMixin
+from blog.paginators import CursorPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("cursor_mode"),
+]
+
+N_POSTS = N_PER_PAGE * 2 + 5
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]+)"')
+
+
+@pytest.fixture
+def cursor_mode():
+    with override_settings(POSTS_PAGINATION="cursor"):
+        yield
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    now = timezone.now()
+    same_date = now - timedelta(days=1)
+    pub_dates = (
+        same_date if i % 3 == 0 else now - timedelta(hours=i)
+        for i in range(N_POSTS)
+    )
+    return mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+def get_page(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` в режиме курсорной пагинации "
+        "загружается без ошибок."
+    )
+    return response
+
+
+def test_cursor_pages_cover_feed(client, many_posts):
+    expected = sorted(
+        many_posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+    seen = []
+    url = "/"
+    while url:
+        with CaptureQueriesContext(connection) as queries:
+            response = get_page(client, url)
+        assert not any(
+            "COUNT(" in query["sql"].upper() for query in queries
+        ), "Убедитесь, что курсорная пагинация не выполняет запрос COUNT."
+        page = response.context["page_obj"]
+        assert len(page) <= N_PER_PAGE
+        seen.extend(post.id for post in page)
+        url = f"/?cursor={page.next_cursor}" if page.has_next() else None
+    assert seen == [post.id for post in expected], (
+        "Убедитесь, что при переходе по курсорам каждая публикация "
+        "выводится ровно один раз и в порядке убывания даты публикации."
+    )
+
+
+def test_cursor_previous_link(client, many_posts):
+    first = get_page(client, "/").context["page_obj"]
+    response = get_page(client, f"/?cursor={first.next_cursor}")
+    second = response.context["page_obj"]
+    content = response.content.decode()
+    assert second.previous_cursor in CURSOR_RE.findall(content), (
+        "Убедитесь, что в пагинаторе есть ссылка на предыдущую страницу."
+    )
+    back = get_page(client, f"/?cursor={second.previous_cursor}").context[
+        "page_obj"
+    ]
+    assert [post.id for post in back] == [post.id for post in first]
+
+
+def test_invalid_cursor_returns_404(client, many_posts):
+    response = client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 404, (
+        "Убедитесь, что некорректный курсор приводит к ошибке 404."
+    )
+
+
+def test_seek_is_range_on_leading_column(many_posts):
+    paginator = CursorPaginator(PostMixin().get_queryset(), N_PER_PAGE)
+    cursor = paginator.page().next_cursor
+    with CaptureQueriesContext(connection) as queries:
+        paginator.page(cursor)
+    where = queries[-1]["sql"].split(" WHERE ", 1)[1]
+    assert re.match(
+        r'\("blog_post"\."pub_date" <= \S+ \S+ AND '
+        r'\("blog_post"\."pub_date" < \S+ \S+ OR "blog_post"\."id" < \d+\)',
+        where,
+    ), (
+        "Убедитесь, что условие курсора идёт первым и ограничивает "
+        f"ведущий столбец диапазоном: {where}"
+    )
@@ -0,0 +1,56 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import EXCERPT_WORDS, Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = " ".join(f"слово{i}" for i in range(EXCERPT_WORDS * 3))
+
+
+def test_excerpt_saved_with_post(mixer, published_category):
+    post = mixer.blend(
+        "blog.Post", text=LONG_TEXT, category=published_category
+    )
+    expected = " ".join(LONG_TEXT.split()[:EXCERPT_WORDS]) + "…"
+    assert Post.objects.get(pk=post.pk).excerpt == expected, (
+        "Убедитесь, что при сохранении поста в анонс записываются первые "
+        f"{EXCERPT_WORDS} слов текста."
+    )
+    post.text = "Новый текст"
+    post.save(update_fields=["text"])
+    assert Post.objects.get(pk=post.pk).excerpt == "Новый текст", (
+        "Убедитесь, что анонс обновляется вместе с текстом поста."
+    )
+
+
+def test_fill_excerpts_command(mixer, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", text=LONG_TEXT, category=published_category
+    )
+    Post.objects.update(excerpt="")
+    call_command("fill_excerpts", batch_size=2, stdout=StringIO())
+    assert all(
+        post.excerpt for post in Post.objects.filter(pk__in=[
+            post.pk for post in posts
+        ])
+    ), "Убедитесь, что команда fill_excerpts заполняет пустые анонсы."
+
+
+def test_feed_does_not_load_text(client, mixer, published_category):
+    mixer.blend(
+        "blog.Post",
+        text=LONG_TEXT,
+        category=published_category,
+        is_published=True,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert "слово0" in response.content.decode()
+    assert not any(
+        '"blog_post"."text"' in query["sql"] for query in queries
+    ), "Убедитесь, что лента не загружает полный текст постов."
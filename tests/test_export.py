@@ -0,0 +1,90 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.export import iter_posts_ndjson
+
+pytestmark = [pytest.mark.django_db]
+
+EXPORT_URL = "/posts/export/"
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def read_export(client, url=EXPORT_URL):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка постов отдаётся потоковым ответом."
+    )
+    content = b"".join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+def test_export_requires_login(client):
+    response = client.get(EXPORT_URL)
+    assert response.status_code == 302
+
+
+def test_export_published_posts(
+        user_client, posts, posts_with_unpublished_category
+):
+    exported = read_export(user_client)
+    assert [item["id"] for item in exported] == [post.id for post in posts], (
+        "Убедитесь, что выгружаются только опубликованные посты."
+    )
+
+
+def test_export_comments_across_chunks(mixer, user, another_user, posts):
+    comments = {
+        posts[0].pk: mixer.cycle(3).blend(
+            "blog.Comment", post=posts[0], author=another_user
+        ),
+        posts[2].pk: mixer.cycle(2).blend(
+            "blog.Comment", post=posts[2], author=user
+        ),
+    }
+    lines = "".join(iter_posts_ndjson(with_comments=True, chunk_size=2))
+    exported = [json.loads(line) for line in lines.splitlines()]
+    assert {
+        item["id"]: [comment["id"] for comment in item["comments"]]
+        for item in exported
+    } == {
+        post.pk: [comment.pk for comment in comments.get(post.pk, [])]
+        for post in posts
+    }, "Убедитесь, что комментарии выгружаются при своих постах."
+
+
+def test_export_with_comments(user_client, mixer, user, posts):
+    comment = mixer.blend("blog.Comment", post=posts[0], author=user)
+    exported = read_export(user_client, f"{EXPORT_URL}?comments=1")
+    assert exported[0]["comments"][0]["id"] == comment.id
+    assert all("comments" in item for item in exported)
+
+
+def test_export_since(user_client, posts):
+    since = timezone.now() + timedelta(minutes=1)
+    url = f"{EXPORT_URL}?since={since.isoformat().replace('+', '%2B')}"
+    assert read_export(user_client, url) == []
+    assert user_client.get(f"{EXPORT_URL}?since=foo").status_code == 400
+
+
+def test_export_hides_unpublished_location(user_client, mixer, posts):
+    posts[0].location = mixer.blend("blog.Location", is_published=False)
+    posts[0].save()
+    posts[1].location = mixer.blend("blog.Location", is_published=True)
+    posts[1].save()
+    exported = {item["id"]: item for item in read_export(user_client)}
+    assert exported[posts[0].pk]["location"] is None, (
+        "Убедитесь, что в выгрузке нет названий неопубликованных "
+        "местоположений."
+    )
+    assert exported[posts[1].pk]["location"] == posts[1].location.name
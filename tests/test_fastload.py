@@ -0,0 +1,134 @@
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.management.commands.fastload import iter_json_array
+from blog.models import Category, Post
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / "db.json"
+EXCLUDE = ["auth.permission", "contenttypes.contenttype", "admin.logentry"]
+
+ITEMS = [
+    {"model": "blog.category", "pk": 1, "fields": {"title": "a, [b]"}},
+    {"text": 'кавычка " и скобка ]', "list": [1, [2, 3], {"k": "}"}]},
+    12345678901234567890,
+    "строка",
+    None,
+    -1.5e10,
+]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_parser_across_chunk_boundaries(read_size):
+    text = "  \n" + json.dumps(ITEMS, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(StringIO(text), read_size)) == ITEMS, (
+        "Убедитесь, что элементы массива разбираются верно, даже если "
+        "граница куска чтения попадает внутрь элемента."
+    )
+
+
+@pytest.mark.parametrize("text", ["", "  ", '{"a": 1}', '[{"a": 1}', "[1,"])
+def test_parser_rejects_broken_input(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(StringIO(text), 2))
+
+
+def test_parser_empty_array():
+    assert list(iter_json_array(StringIO("[ ]"), 1)) == []
+
+
+@pytest.fixture
+def write_fixture(tmp_path):
+    def write(items):
+        path = tmp_path / "fixture.json"
+        path.write_text(json.dumps(items), encoding="utf-8")
+        return str(path)
+
+    return write
+
+
+@pytest.mark.parametrize("batch_size", [1, 5000])
+def test_children_before_parents(write_fixture, batch_size):
+    fixture = write_fixture([
+        {"model": "blog.post", "pk": 7, "fields": {
+            "title": "Пост", "text": "Текст", "author": 3, "category": 5,
+            "pub_date": "2022-12-18T23:03:52Z", "is_published": True,
+        }},
+        {"model": "blog.category", "pk": 5, "fields": {
+            "title": "Категория", "slug": "cat", "description": "",
+            "is_published": True,
+        }},
+        {"model": "auth.user", "pk": 3, "fields": {
+            "username": "author", "password": "",
+        }},
+    ])
+    call_command("fastload", fixture, batch_size=batch_size,
+                 stdout=StringIO())
+    post = Post.objects.select_related("category", "author").get()
+    assert (post.pk, post.category.slug, post.author.username) == (
+        7, "cat", "author"
+    ), "Убедитесь, что fastload загружает посты раньше их категорий."
+
+
+def test_dangling_foreign_key_rejected(write_fixture):
+    fixture = write_fixture([
+        {"model": "blog.category", "pk": 1, "fields": {
+            "title": "Категория", "slug": "cat", "description": "",
+        }},
+        {"model": "blog.post", "pk": 1, "fields": {
+            "title": "Пост", "text": "", "author": 99, "category": 1,
+            "pub_date": "2022-12-18T23:03:52Z",
+        }},
+    ])
+    with pytest.raises(CommandError, match="foreign key"):
+        call_command("fastload", fixture, stdout=StringIO())
+    assert not Category.objects.exists()
+
+
+def test_db_json_round_trip():
+    call_command("fastload", str(DB_JSON), exclude=EXCLUDE,
+                 stdout=StringIO())
+    expected = [
+        item for item in json.loads(DB_JSON.read_text(encoding="utf-8"))
+        if item["model"].startswith("blog.")
+    ]
+    dumped = StringIO()
+    call_command("dumpdata", "blog.category", "blog.location", "blog.post",
+                 stdout=dumped)
+    dumped = {
+        (item["model"], item["pk"]): item["fields"]
+        for item in json.loads(dumped.getvalue())
+    }
+    assert len(dumped) == len(expected)
+    for item in expected:
+        fields = dumped[item["model"], item["pk"]]
+        assert {name: fields[name] for name in item["fields"]} == (
+            item["fields"]
+        ), f"Убедитесь, что {item['model']} {item['pk']} загружен без потерь."
+    assert Post.objects.filter(comment_count=0).count() == len(
+        [item for item in expected if item["model"] == "blog.post"]
+    )
+
+
+def test_existing_rows_suggest_ignore_conflicts():
+    with pytest.raises(CommandError, match="auth.Permission.*-e auth"):
+        call_command("fastload", str(DB_JSON), stdout=StringIO())
+    assert not Category.objects.exists()
+
+
+def test_ignore_conflicts_counts_inserted_rows():
+    call_command("fastload", str(DB_JSON), exclude=EXCLUDE[1:],
+                 ignore_conflicts=True, stdout=StringIO())
+    output = StringIO()
+    call_command("fastload", str(DB_JSON), exclude=EXCLUDE[1:],
+                 ignore_conflicts=True, stdout=output)
+    assert "Загружено строк: 0 " in output.getvalue(), (
+        "Убедитесь, что fastload с --ignore-conflicts считает только "
+        "вставленные строки."
+    )
@@ -0,0 +1,32 @@
+import pytest
+from django.db import connection
+
+from blog.mixins import PostMixin
+
+pytestmark = [pytest.mark.django_db]
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " | ".join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="план SQLite")
+@pytest.mark.parametrize(
+    "by_category, index",
+    [(False, "post_published_feed_idx"), (True, "post_category_feed_idx")],
+)
+def test_feed_page_uses_partial_index(
+    mixer, published_category, by_category, index
+):
+    mixer.cycle(5).blend("blog.Post", category=published_category)
+    feed = PostMixin().get_queryset()
+    if by_category:
+        feed = feed.filter(category=published_category)
+    plan = query_plan(feed[:10])
+    assert index in plan and "TEMP B-TREE" not in plan, (
+        "Убедитесь, что первая страница ленты читается по частичному "
+        f"индексу без сортировки: {plan}"
+    )
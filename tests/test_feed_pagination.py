@@ -0,0 +1,182 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import ALL_PAGES_TAG, INDEX_TAG, count_tag, set_tagged
+from blog.mixins import PostMixin
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = N_PER_PAGE * 3
+PAGE_ITEM_RE = re.compile(r'<li class="page-item')
+
+
+@pytest.fixture
+def make_posts(mixer, user, published_category):
+    def make(count):
+        return mixer.cycle(count).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+
+    return make
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        query["sql"] for query in queries if "COUNT(" in query["sql"]
+    ]
+
+
+def test_feed_count_is_cached(user_client, make_posts):
+    make_posts(N_POSTS)
+    response, counts = count_queries(user_client, "/")
+    assert len(counts) == 1
+    assert response.context["paginator"].num_pages == 3
+    response, counts = count_queries(user_client, "/?page=2")
+    assert counts == [], (
+        "Убедитесь, что число постов ленты берётся из кэша, а не COUNT(*) "
+        "на каждой странице."
+    )
+
+
+def test_feed_count_follows_new_posts(user_client, make_posts):
+    make_posts(N_POSTS)
+    count_queries(user_client, "/")
+    make_posts(1)
+    response, counts = count_queries(user_client, "/")
+    assert len(counts) == 1
+    assert response.context["paginator"].num_pages == 4, (
+        "Убедитесь, что кэш числа постов сбрасывается при новом посте."
+    )
+
+
+def test_feed_count_survives_comments(user_client, mixer, user, make_posts):
+    posts = make_posts(N_POSTS)
+    count_queries(user_client, "/")
+    mixer.blend("blog.Comment", post=posts[0], author=user)
+    posts[1].title = "Новый заголовок"
+    posts[1].save()
+    _, counts = count_queries(user_client, "/")
+    assert counts == [], (
+        "Убедитесь, что комментарии и правки текста не сбрасывают "
+        "кэш числа постов ленты."
+    )
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"is_published": False},
+        {"pub_date": timezone.now() + timedelta(days=1)},
+    ],
+)
+def test_feed_count_follows_unpublished_posts(
+    user_client, make_posts, change
+):
+    posts = make_posts(N_POSTS)
+    count_queries(user_client, "/")
+    for field, value in change.items():
+        setattr(posts[0], field, value)
+    posts[0].save()
+    response, counts = count_queries(user_client, "/?page=3")
+    assert len(counts) == 1
+    assert response.context["paginator"].count == N_POSTS - 1, (
+        "Убедитесь, что кэш числа постов сбрасывается, когда пост "
+        "покидает ленту."
+    )
+
+
+def test_category_count_follows_category_change(
+    client, mixer, make_posts, published_category
+):
+    other = mixer.blend("blog.Category", is_published=True)
+    posts = make_posts(2)
+    url = f"/category/{other.slug}/"
+    count_queries(client, url)
+    posts[0].category = other
+    posts[0].save()
+    response, _ = count_queries(client, url)
+    assert response.context["paginator"].count == 1, (
+        "Убедитесь, что кэш числа постов категории сбрасывается при "
+        "переносе поста в неё."
+    )
+
+
+def test_feed_count_follows_deleted_posts(user_client, make_posts):
+    posts = make_posts(N_POSTS)
+    count_queries(user_client, "/")
+    posts[0].delete()
+    response, _ = count_queries(user_client, "/")
+    assert response.context["paginator"].count == N_POSTS - 1
+
+
+def set_index_count(count):
+    tags = (ALL_PAGES_TAG, count_tag(INDEX_TAG))
+    set_tagged("post_count:" + ":".join(tags), tags, count, None)
+
+
+def test_huge_feed_renders_elided_page_range(client, make_posts):
+    make_posts(N_PER_PAGE + 1)
+    set_index_count(N_PER_PAGE * 100_000)
+    content = client.get("/").content.decode()
+    assert "?page=100000" in content
+    assert "…" in content
+    assert len(PAGE_ITEM_RE.findall(content)) < 15, (
+        "Убедитесь, что для огромной ленты выводятся не все номера страниц."
+    )
+
+
+@pytest.mark.parametrize(
+    "number, expected",
+    [
+        (1, [1, 2, 3, 4, "…", 10**12 - 1, 10**12]),
+        (10**6, [1, 2, "…", 10**6 - 3, 10**6 - 2, 10**6 - 1, 10**6,
+                 10**6 + 1, 10**6 + 2, 10**6 + 3, "…", 10**12 - 1, 10**12]),
+        (10**12, [1, 2, "…", *range(10**12 - 3, 10**12 + 1)]),
+    ],
+)
+def test_page_range_for_trillion_pages(number, expected):
+    paginator = Paginator(range(10**12 * N_PER_PAGE), N_PER_PAGE)
+    assert PostMixin().get_page_range(paginator.page(number)) == expected, (
+        "Убедитесь, что номера страниц строятся окном вокруг текущей "
+        "и по краям, без перебора всех страниц."
+    )
+
+
+def test_page_range_window_is_configurable(settings):
+    settings.PAGINATION_WINDOW = 1
+    settings.PAGINATION_EDGES = 0
+    paginator = Paginator(range(1000 * N_PER_PAGE), N_PER_PAGE)
+    assert PostMixin().get_page_range(paginator.page(500)) == [
+        "…", 499, 500, 501, "…"
+    ]
+    mixin = PostMixin()
+    mixin.page_range_window = 0
+    mixin.page_range_edges = 1
+    assert mixin.get_page_range(paginator.page(500)) == [
+        1, "…", 500, "…", 1000
+    ]
+
+
+def test_huge_feed_deep_page(client, make_posts):
+    make_posts(1)
+    set_index_count(N_PER_PAGE * 1_000_000)
+    response = client.get("/", {"page": 500_000})
+    content = response.content.decode()
+    assert response.status_code == 200
+    for number in (1, 2, 499_997, 500_000, 500_003, 999_999, 1_000_000):
+        assert f"{number}</" in content
+    assert len(PAGE_ITEM_RE.findall(content)) < 20
@@ -0,0 +1,138 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import (
+    enqueue_renditions, generate_renditions, make_renditions, rendition_name,
+    rendition_srcset
+)
+from blog.models import Post
+from core.models import Task
+
+pytestmark = [pytest.mark.django_db]
+
+ORIENTATION_TAG = 0x0112
+ROTATED_90 = 6
+
+
+@pytest.fixture(autouse=True)
+def image_widths(settings, media_root):
+    settings.POST_IMAGE_WIDTHS = (320, 640, 1280)
+
+
+def save_jpeg(name, size, orientation=None):
+    exif = Image.Exif()
+    if orientation:
+        exif[ORIENTATION_TAG] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", size, "red").save(buffer, "JPEG", exif=exif)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def open_rendition(name, width):
+    with default_storage.open(rendition_name(name, width)) as file:
+        image = Image.open(file)
+        image.load()
+        return image
+
+
+def test_renditions_are_resized_and_stripped():
+    name = save_jpeg("posts_images/photo.jpg", (2000, 1000), ROTATED_90)
+    assert generate_renditions(name) == 2, (
+        "Убедитесь, что копии создаются только для ширин не больше "
+        "ширины оригинала с учётом поворота из EXIF."
+    )
+    for width in (320, 640):
+        rendition = open_rendition(name, width)
+        assert rendition.size == (width, width * 2)
+        assert ORIENTATION_TAG not in rendition.getexif(), (
+            "Убедитесь, что из копий изображений удаляются метаданные EXIF."
+        )
+    assert not default_storage.exists(rendition_name(name, 1280))
+    assert generate_renditions(name) == 0
+
+
+def test_small_image_gets_single_rendition():
+    name = save_jpeg("posts_images/small.jpg", (100, 50))
+    assert generate_renditions(name) == 1
+    assert open_rendition(name, 320).size == (100, 50)
+
+
+def test_card_uses_srcset(
+    client, mixer, published_category, django_capture_on_commit_callbacks
+):
+    name = save_jpeg("posts_images/card.jpg", (1500, 1000))
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend(
+            "blog.Post",
+            image=name,
+            category=published_category,
+            is_published=True,
+        )
+    content = client.get("/").content.decode()
+    assert f"{default_storage.url(rendition_name(name, 640))} 640w" in (
+        content
+    ), "Убедитесь, что карточка поста выводит srcset из уменьшенных копий."
+    assert 'loading="lazy"' in content
+
+
+def test_legacy_image_queued_once(
+    settings, django_capture_on_commit_callbacks
+):
+    settings.TASKS_EAGER = False
+    name = save_jpeg("posts_images/queued.jpg", (700, 700))
+    with django_capture_on_commit_callbacks(execute=True):
+        enqueue_renditions(name)
+        enqueue_renditions(name)
+    assert Task.objects.count() == 1, (
+        "Убедитесь, что копии одного изображения ставятся в очередь "
+        "один раз."
+    )
+    call_command("run_worker", processes=0, burst=True, stdout=StringIO())
+    assert default_storage.exists(rendition_name(name, 640)), (
+        "Убедитесь, что воркер создаёт копии изображений."
+    )
+
+
+def test_generate_renditions_command(mixer, published_category):
+    names = [
+        save_jpeg(f"posts_images/legacy{i}.jpg", (800, 600))
+        for i in range(2)
+    ]
+    for name in names:
+        mixer.blend("blog.Post", image=name, category=published_category)
+    call_command("generate_renditions", stdout=StringIO())
+    assert all(
+        default_storage.exists(rendition_name(name, 640)) for name in names
+    ), "Убедитесь, что команда generate_renditions создаёт копии."
+
+
+def test_srcset_is_cached_until_renditions_are_made(
+    monkeypatch, settings, django_assert_num_queries,
+    django_capture_on_commit_callbacks
+):
+    settings.TASKS_EAGER = False
+    name = save_jpeg("posts_images/cached.jpg", (700, 700))
+    image = Post(image=name).image
+    with django_capture_on_commit_callbacks(execute=True):
+        assert rendition_srcset(image) == ""
+    assert Task.objects.count() == 1
+
+    def exists(name):
+        raise AssertionError("Проверка файла копии при показе страницы.")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(default_storage, "exists", exists)
+        with django_assert_num_queries(0):
+            assert rendition_srcset(image) == "", (
+                "Убедитесь, что srcset изображения кэшируется и показ "
+                "страницы не обращается к хранилищу и базе."
+            )
+    make_renditions(name)
+    assert f"{default_storage.url(rendition_name(name, 640))} 640w" in (
+        rendition_srcset(image)
+    ), "Убедитесь, что после создания копий кэш srcset сбрасывается."
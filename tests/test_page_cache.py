@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def page_urls(post):
+    return (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+
+
+def test_anonymous_pages_served_from_cache(
+        client, post, django_assert_num_queries
+):
+    for url in page_urls(post):
+        assert client.get(url).status_code == 200
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` для анонимного читателя "
+            "отдаётся из кэша без запросов к базе данных."
+        )
+
+
+def test_post_edit_purges_cached_pages(client, post):
+    for url in page_urls(post):
+        client.get(url)
+    post.title = "Изменённый заголовок"
+    post.save()
+    for url in page_urls(post):
+        assert "Изменённый заголовок" in client.get(url).content.decode(), (
+            f"Убедитесь, что изменение поста сбрасывает кэш страницы `{url}`."
+        )
+
+
+def test_new_comment_purges_detail_page(client, mixer, user, post):
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    comment = mixer.blend(
+        "blog.Comment", post=post, author=user, text="Новый комментарий"
+    )
+    assert comment.text in client.get(url).content.decode()
+
+
+def test_authenticated_users_bypass_cache(user_client, post):
+    user_client.get("/")
+    type(post).objects.filter(pk=post.pk).update(is_published=False)
+    assert post.title not in user_client.get("/").content.decode(), (
+        "Убедитесь, что авторизованным пользователям страницы не отдаются "
+        "из полностраничного кэша."
+    )
+
+
+def test_cache_timeout_stops_at_next_publication(mixer, user, post):
+    from blog.utils import get_feed_cache_timeout
+
+    assert get_feed_cache_timeout(3600) == 3600
+    mixer.blend(
+        "blog.Post", author=user, category=post.category, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=90),
+    )
+    assert 85 <= get_feed_cache_timeout(3600) <= 90, (
+        "Убедитесь, что срок жизни кэша лент не превышает времени до "
+        "ближайшей отложенной публикации."
+    )
+
+
+def test_scheduled_post_appears_when_published(client, mixer, user, post):
+    future = mixer.blend(
+        "blog.Post", author=user, category=post.category, is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=90),
+    )
+    assert future.title not in client.get("/").content.decode()
+    later = timezone.now() + timedelta(seconds=91)
+    with mock.patch("django.utils.timezone.now", return_value=later), \
+            mock.patch("time.time", return_value=later.timestamp()):
+        assert future.title in client.get("/").content.decode(), (
+            "Убедитесь, что отложенная публикация появляется в ленте, "
+            "как только наступает её время."
+        )
+
+
+def test_local_page_cache_keeps_short_ttl(settings):
+    from blog.cache import page_cache_timeout
+
+    settings.PAGE_CACHE_TIMEOUT = 6 * 60 * 60
+    settings.PAGE_CACHE_LOCAL_TIMEOUT = 60
+    assert page_cache_timeout() == 60, (
+        "Убедитесь, что с кэшем в памяти процесса страницы не хранятся "
+        "дольше PAGE_CACHE_LOCAL_TIMEOUT."
+    )
+    settings.CACHES = {
+        **settings.CACHES,
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "page_cache",
+        },
+    }
+    assert page_cache_timeout() == 6 * 60 * 60
+
+
+def test_deploy_check_warns_about_local_page_cache():
+    from blog.checks import check_page_cache_shared
+
+    assert [warning.id for warning in check_page_cache_shared(None)] == [
+        "blog.W001"
+    ]
+
+
+def test_user_save_purges_pages_only_on_name_change(client, user, post):
+    from blog.cache import ALL_PAGES_TAG, _tag_key
+
+    cache = caches["default"]
+    client.get(f"/posts/{post.id}/")
+    version = cache.get(_tag_key(ALL_PAGES_TAG))
+    user.email = "new@example.com"
+    user.set_password("new-password")
+    user.save()
+    get_user_model().objects.create_user("newcomer", password="secret")
+    assert cache.get(_tag_key(ALL_PAGES_TAG)) == version, (
+        "Убедитесь, что регистрация и смена пароля или e-mail не "
+        "сбрасывают кэш страниц."
+    )
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in client.get(
+        f"/posts/{post.id}/"
+    ).content.decode(), (
+        "Убедитесь, что смена имени автора сбрасывает кэш страниц."
+    )
@@ -0,0 +1,40 @@
+import pytest
+
+from blog.cache import post_card_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def load_index(client):
+    post_card_stats.clear()
+    content = client.get("/").content.decode()
+    return content, post_card_stats["hits"], post_card_stats["misses"]
+
+
+def test_post_card_served_from_cache(user_client, post):
+    _, hits, misses = load_index(user_client)
+    assert (hits, misses) == (0, 1)
+    _, hits, misses = load_index(user_client)
+    assert (hits, misses) == (1, 0), (
+        "Убедитесь, что повторный рендер карточки поста берётся из кэша."
+    )
+
+
+def test_comment_invalidates_post_card(user_client, mixer, user, post):
+    load_index(user_client)
+    mixer.blend("blog.Comment", post=post, author=user)
+    content, hits, misses = load_index(user_client)
+    assert (hits, misses) == (0, 1)
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что после добавления комментария карточка поста "
+        "показывает актуальное число комментариев."
+    )
+
+
+def test_category_change_invalidates_post_card(user_client, post):
+    load_index(user_client)
+    post.category.title = "Новое название категории"
+    post.category.save()
+    content, hits, misses = load_index(user_client)
+    assert (hits, misses) == (0, 1)
+    assert "Новое название категории" in content
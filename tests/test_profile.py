@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feeds(mixer, user, another_user, published_category):
+    def blend(author, count, **kwargs):
+        return mixer.cycle(count).blend(
+            "blog.Post",
+            author=author,
+            category=published_category,
+            pub_date=timezone.now() - timedelta(days=1),
+            **kwargs,
+        )
+
+    hidden = blend(user, 1, is_published=False)
+    return blend(user, 3, is_published=True) + hidden, blend(
+        another_user, 2, is_published=True
+    )
+
+
+def profile_post_ids(client, user):
+    response = client.get(reverse("blog:profile", args=[user.username]))
+    return {post.id for post in response.context["page_obj"]}
+
+
+def test_profile_shows_only_author_posts(
+    client, another_user_client, user, feeds
+):
+    own, _ = feeds
+    visible = {post.id for post in own if post.is_published}
+    for reader in (client, another_user_client):
+        assert profile_post_ids(reader, user) == visible, (
+            "Убедитесь, что на странице профиля другим пользователям видны "
+            "только опубликованные посты этого автора."
+        )
+
+
+def test_owner_sees_own_hidden_posts(user_client, user, feeds):
+    own, _ = feeds
+    assert profile_post_ids(user_client, user) == {post.id for post in own}
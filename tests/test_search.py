@@ -0,0 +1,175 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.paginators import PREVIOUS
+from blog.search import SearchPaginator, get_search_index, search_terms
+from blog.stemmer import stem
+from blog.utils import get_post_list
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["fts5", "table"])
+def search_backend(request, settings):
+    settings.SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def make_post(mixer, published_category):
+    def make(title, text="", **kwargs):
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            "blog.Post",
+            title=title,
+            text=text,
+            category=published_category,
+            **kwargs,
+        )
+
+    return make
+
+
+def found_ids(query, per_page=10):
+    page = SearchPaginator(query, get_post_list(), per_page).page()
+    return [post.pk for post in page]
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        ("книга", "книги", "книгами", "книгу"),
+        ("прогулка", "прогулки", "прогулкой"),
+        ("лес", "лесу", "лесом", "леса"),
+    ],
+)
+def test_stemmer_groups_word_forms(words):
+    assert len({stem(word) for word in words}) == 1, (
+        "Убедитесь, что формы одного слова приводятся к одной основе."
+    )
+
+
+def test_search_terms_skip_stop_words():
+    assert search_terms("Прогулка по лесу и по лесу") == ["прогулк", "лес"]
+
+
+def test_search_finds_word_forms(search_backend, make_post):
+    post = make_post("Прогулка по лесу", "Мы долго гуляли.")
+    make_post("Поездка к морю", "Купались и загорали.")
+    assert found_ids("прогулки в лесах") == [post.pk], (
+        "Убедитесь, что поиск находит пост по другим формам слов."
+    )
+    assert found_ids("лесная прогулка горы") == [], (
+        "Убедитесь, что пост должен содержать все слова запроса."
+    )
+
+
+def test_title_ranks_above_text(search_backend, make_post):
+    in_text = make_post("Заметки", "Сегодня видели оленя у реки.")
+    in_title = make_post("Олени у реки", "Сегодня гуляли.")
+    assert found_ids("олень") == [in_title.pk, in_text.pk], (
+        "Убедитесь, что совпадение в заголовке ранжируется выше, чем "
+        "совпадение в тексте."
+    )
+
+
+def test_hidden_posts_not_found(search_backend, make_post):
+    make_post("Скрытый дневник", is_published=False)
+    make_post(
+        "Будущий дневник", pub_date=timezone.now() + timedelta(days=1)
+    )
+    assert found_ids("дневник") == [], (
+        "Убедитесь, что поиск не показывает неопубликованные посты."
+    )
+
+
+def test_index_follows_save_and_delete(search_backend, make_post):
+    post = make_post("Старое название")
+    post.title = "Новое название"
+    post.save()
+    assert found_ids("старое") == []
+    assert found_ids("новые") == [post.pk], (
+        "Убедитесь, что индекс обновляется при изменении поста."
+    )
+    post.delete()
+    assert found_ids("новые") == [], (
+        "Убедитесь, что удалённый пост убирается из индекса."
+    )
+
+
+def test_keyset_pages_cover_results(search_backend, make_post):
+    posts = [
+        make_post("Кошки", " ".join(["кошка"] * (i % 4 + 1)))
+        for i in range(12)
+    ]
+    paginator = SearchPaginator("кошка", get_post_list(), 5)
+    page = paginator.page()
+    seen = list(page)
+    while page.has_next():
+        page = paginator.page(page.next_cursor)
+        seen.extend(page)
+    assert sorted(post.pk for post in seen) == sorted(
+        post.pk for post in posts
+    ), "Убедитесь, что страницы поиска без пропусков и повторов."
+    keys = [(post.search_score, post.pk) for post in seen]
+    assert keys == sorted(keys, reverse=True), (
+        "Убедитесь, что результаты упорядочены по релевантности."
+    )
+    previous = paginator.page(
+        paginator.encode_cursor(seen[10], PREVIOUS)
+    )
+    assert list(previous) == seen[5:10]
+
+
+def test_rebuild_search_index(search_backend, make_post):
+    post = make_post("Горные озёра")
+    get_search_index().clear()
+    assert found_ids("озеро") == []
+    call_command("rebuild_search_index", batch_size=1, stdout=StringIO())
+    assert found_ids("озеро") == [post.pk], (
+        "Убедитесь, что команда rebuild_search_index заполняет индекс."
+    )
+
+
+def test_table_search_does_not_count_posts(settings, make_post):
+    settings.SEARCH_BACKEND = "table"
+    post = make_post("Горные озёра")
+    found_ids("озеро")
+    with CaptureQueriesContext(connection) as queries:
+        assert found_ids("озеро") == [post.pk]
+    assert not any(
+        'FROM "blog_post"' in query["sql"] and "COUNT(*)" in query["sql"]
+        for query in queries
+    ), "Убедитесь, что поиск не считает все посты на каждый запрос."
+
+
+def test_migration_backfills_index(search_backend, make_post):
+    post = make_post("Горные озёра")
+    get_search_index().clear()
+    migration = import_module("blog.migrations.0012_backfill_search_index")
+    migration.backfill_search_index(apps, None)
+    assert found_ids("озеро") == [post.pk], (
+        "Убедитесь, что миграция индексирует уже существующие посты."
+    )
+
+
+def test_search_page(client, make_post):
+    posts = [make_post(f"Рецепт пирога {i}") for i in range(12)]
+    response = client.get("/search/", {"q": "пироги"})
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert posts[-1].title in content
+    assert "?q=%D0%BF%D0%B8%D1%80%D0%BE%D0%B3%D0%B8&amp;cursor=" in content, (
+        "Убедитесь, что ссылки на страницы поиска сохраняют запрос."
+    )
+    assert client.get("/search/", {"q": "пироги", "cursor": "x"}
+                      ).status_code == 404
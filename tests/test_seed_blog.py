@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def seed(**options):
+    call_command("seed_blog", seed=1, stdout=StringIO(), **options)
+
+
+def test_comment_dates_follow_posts():
+    started = timezone.now()
+    seed(users=5, posts=30, comments=200)
+    assert not Comment.objects.filter(
+        created_at__lt=F("post__pub_date"), post__pub_date__lte=started
+    ).exists(), "Убедитесь, что комментарии датированы после публикации."
+    assert not Comment.objects.filter(created_at__gt=timezone.now()).exists()
+    assert Comment.objects.filter(created_at__lt=started).count() > 100, (
+        "Убедитесь, что даты комментариев распределены по истории, а не "
+        "равны моменту загрузки."
+    )
+    assert Post.objects.values("created_at").distinct().count() == 30
+
+
+def test_comments_onto_existing_posts():
+    seed(users=3, posts=10, comments=0)
+    seed(users=0, posts=0, comments=50)
+    assert Post.objects.count() == 10
+    assert Comment.objects.count() == 50, (
+        "Убедитесь, что без --posts комментарии создаются к имеющимся "
+        "постам."
+    )
+
+
+def test_comments_without_posts_rejected():
+    with pytest.raises(CommandError, match="--posts"):
+        seed(users=3, posts=0, comments=10)
+    assert not Comment.objects.exists()
+
+
+def test_post_dates_kept_without_touching_the_field(monkeypatch):
+    field = Post._meta.get_field("created_at")
+    bulk_create = Post.objects.bulk_create
+    flags = []
+
+    def spy(objs, *args, **kwargs):
+        flags.append(field.auto_now_add)
+        return bulk_create(objs, *args, **kwargs)
+
+    monkeypatch.setattr(Post.objects, "bulk_create", spy)
+    seed(users=2, posts=30, comments=0, batch_size=7)
+    assert len(flags) == 5 and all(flags), (
+        "Убедитесь, что seed_blog не отключает auto_now_add у общего поля "
+        "модели."
+    )
+    assert not Post.objects.filter(created_at__gt=F("pub_date")).exists(), (
+        "Убедитесь, что посты сохраняют сгенерированные даты created_at "
+        "во всех пачках."
+    )
@@ -0,0 +1,187 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.management.commands import run_worker
+from core.models import Task
+from core.tasks import claim_tasks, run_task, task
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task
+def always_fail():
+    raise RuntimeError("сбой задачи")
+
+
+@pytest.fixture(autouse=True)
+def lazy_tasks(settings):
+    settings.TASKS_EAGER = False
+    settings.TASK_RETRY_DELAY = 0
+    calls.clear()
+
+
+def test_enqueue_after_commit(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        record_call.enqueue(value=1)
+        assert not Task.objects.exists(), (
+            "Убедитесь, что задача создаётся только после коммита "
+            "транзакции."
+        )
+    assert len(callbacks) == 1
+    task = Task.objects.get()
+    assert (task.name, task.kwargs) == (
+        f"{__name__}.record_call", {"value": 1}
+    )
+
+
+def test_enqueue_discarded_on_rollback(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with transaction.atomic():
+            record_call.enqueue(value=1)
+            transaction.set_rollback(True)
+    assert not callbacks and not Task.objects.exists(), (
+        "Убедитесь, что при откате транзакции задача не ставится "
+        "в очередь."
+    )
+
+
+def test_idempotency_key(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        record_call.enqueue(key="once", value=1)
+        record_call.enqueue(key="once", value=2)
+    call_command("run_worker", processes=0, burst=True, stdout=StringIO())
+    assert calls == [1], (
+        "Убедитесь, что задача с уже известным ключом не выполняется "
+        "повторно."
+    )
+
+
+def test_known_key_not_inserted_again(django_capture_on_commit_callbacks):
+    Task.objects.create(name=f"{__name__}.always_fail", key="failed",
+                        status=Task.FAILED)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with CaptureQueriesContext(connection) as queries:
+            always_fail.enqueue(key="failed")
+    assert not callbacks, (
+        "Убедитесь, что задача с известным ключом не ставится в очередь "
+        "повторно, даже если она завершилась ошибкой."
+    )
+    assert not any("INSERT" in query["sql"] for query in queries)
+    assert Task.objects.get().status == Task.FAILED
+
+
+def test_retries_then_fails(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        always_fail.enqueue()
+    task = Task.objects.get()
+    statuses = []
+    for _ in range(task.max_attempts):
+        (task_id,) = claim_tasks(1)
+        statuses.append(run_task(task_id))
+    assert statuses == [Task.PENDING, Task.PENDING, Task.FAILED], (
+        "Убедитесь, что задача повторяется до max_attempts раз, "
+        "а затем помечается ошибочной."
+    )
+    task.refresh_from_db()
+    assert "сбой задачи" in task.last_error
+    assert claim_tasks(1) == []
+
+
+def test_claim_is_exclusive(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        record_call.enqueue(value=1)
+    assert len(claim_tasks(5)) == 1
+    assert claim_tasks(5) == [], (
+        "Убедитесь, что взятая в работу задача не выдаётся повторно."
+    )
+
+
+def test_claim_counts_attempts(django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        record_call.enqueue(value=1)
+    claim_tasks(1)
+    assert Task.objects.get().attempts == 1, (
+        "Убедитесь, что попытка засчитывается при взятии задачи в работу."
+    )
+
+
+def test_stuck_task_fails_after_max_attempts(settings):
+    locked_at = timezone.now() - timedelta(
+        seconds=settings.TASK_LOCK_TIMEOUT + 1
+    )
+    stuck = Task.objects.create(
+        name=f"{__name__}.record_call", status=Task.RUNNING,
+        locked_at=locked_at, attempts=3, max_attempts=3,
+    )
+    retried = Task.objects.create(
+        name=f"{__name__}.record_call", status=Task.RUNNING,
+        locked_at=locked_at, attempts=1, max_attempts=3,
+    )
+    assert claim_tasks(5) == [retried.pk]
+    stuck.refresh_from_db()
+    assert stuck.status == Task.FAILED, (
+        "Убедитесь, что зависшая задача, исчерпавшая попытки, помечается "
+        "ошибочной, а не возвращается в очередь."
+    )
+
+
+class BreakingPool:
+    """Пул, у которого первый экземпляр сломан, а следующие выполняют
+    задачи в текущем процессе."""
+
+    instances = 0
+
+    def __init__(self, *args, **kwargs):
+        BreakingPool.instances += 1
+        self.broken = BreakingPool.instances == 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, func, task_id):
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("процесс пула погиб"))
+        else:
+            future.set_result(run_task(task_id))
+        return future
+
+
+def test_broken_pool_is_recreated(
+    monkeypatch, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        record_call.enqueue(value=1)
+    monkeypatch.setattr(BreakingPool, "instances", 0)
+    monkeypatch.setattr(run_worker, "ProcessPoolExecutor", BreakingPool)
+    stderr = StringIO()
+    call_command("run_worker", processes=1, burst=True, stdout=StringIO(),
+                 stderr=stderr)
+    task = Task.objects.get()
+    assert BreakingPool.instances == 2, (
+        "Убедитесь, что сломанный пул процессов создаётся заново."
+    )
+    assert (task.status, task.attempts, calls) == (Task.DONE, 2, [1]), (
+        "Убедитесь, что задача из сломанного пула завершается ошибкой и "
+        "повторяется."
+    )
+    assert "BrokenProcessPool" in task.last_error
+    assert "Пул процессов сломан" in stderr.getvalue()
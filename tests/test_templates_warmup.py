@@ -0,0 +1,84 @@
+import importlib
+import sys
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.template import engines
+
+from blog.benchmarks import templates_setting
+from blog.cache import PROCESS_LOCAL_BACKENDS
+from core.warmup import template_names, warm_templates
+
+PRODUCTION_SETTINGS = "blogicum.settings_production"
+
+
+def import_production_settings():
+    sys.modules.pop(PRODUCTION_SETTINGS, None)
+    return importlib.import_module(PRODUCTION_SETTINGS)
+
+
+@pytest.fixture
+def settings_production(monkeypatch):
+    monkeypatch.setenv("DJANGO_SECRET_KEY", "production-secret")
+    yield import_production_settings()
+    sys.modules.pop(PRODUCTION_SETTINGS, None)
+
+
+@pytest.fixture
+def cached_loader(settings):
+    settings.TEMPLATES = templates_setting(cached=True)
+    return engines["django"].engine.template_loaders[0]
+
+
+def test_production_settings_use_cached_loader(settings_production):
+    assert settings_production.DEBUG is False
+    assert "debug_toolbar" not in settings_production.INSTALLED_APPS
+    (loader, _), = settings_production.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loader == "django.template.loaders.cached.Loader", (
+        "Убедитесь, что в продакшен-настройках шаблоны кэшируются."
+    )
+    assert settings_production.WARM_TEMPLATES is True
+
+
+def test_production_settings_require_secret_key(monkeypatch):
+    monkeypatch.delenv("DJANGO_SECRET_KEY", raising=False)
+    with pytest.raises(ImproperlyConfigured, match="DJANGO_SECRET_KEY"):
+        import_production_settings()
+    sys.modules.pop(PRODUCTION_SETTINGS, None)
+
+
+def test_production_page_cache_is_shared(settings_production):
+    assert settings_production.SECRET_KEY == "production-secret"
+    page_cache = settings_production.CACHES[settings_production.PAGE_CACHE]
+    assert page_cache["BACKEND"] not in PROCESS_LOCAL_BACKENDS, (
+        "Убедитесь, что в продакшен-настройках кэш страниц общий "
+        "для всех воркеров."
+    )
+
+
+def test_warm_templates_fills_cache(cached_loader):
+    names = template_names(engines["django"].engine)
+    assert {"base.html", "includes/post_card.html"} <= set(names)
+    assert not any(name.startswith("admin/") for name in names)
+    timings = warm_templates()
+    assert set(timings) == set(names)
+    assert len(cached_loader.get_template_cache) == len(names), (
+        "Убедитесь, что прогрев разбирает каждый шаблон проекта один раз "
+        "и сохраняет его в кэше загрузчика."
+    )
+
+
+def test_warm_templates_command(cached_loader):
+    out = StringIO()
+    call_command("warm_templates", top=3, stdout=out)
+    assert "Разобрано шаблонов:" in out.getvalue()
+
+
+def test_warm_templates_reports_syntax_errors(settings, tmp_path):
+    (tmp_path / "broken.html").write_text("{% if %}")
+    settings.TEMPLATES = templates_setting(cached=True)
+    settings.TEMPLATES[0]["DIRS"] = [tmp_path]
+    with pytest.raises(CommandError, match="broken.html|if"):
+        call_command("warm_templates", stdout=StringIO())
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+ORIENTATION_TAG = 0x0112
+MAKE_TAG = 0x010F
+
+
+@pytest.fixture(autouse=True)
+def max_side(settings, media_root):
+    settings.POST_IMAGE_MAX_SIDE = 200
+
+
+def jpeg_upload(size=(400, 300), exif=True, name="photo.jpg"):
+    data = Image.Exif()
+    if exif:
+        data[ORIENTATION_TAG] = 6
+        data[MAKE_TAG] = "Camera"
+    buffer = BytesIO()
+    Image.new("RGB", size, "green").save(buffer, "JPEG", exif=data)
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def post_data(published_category, image):
+    return {
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": (timezone.now() - timedelta(hours=1)).strftime(
+            "%Y-%m-%dT%H:%M"
+        ),
+        "category": published_category.pk,
+        "is_published": True,
+        "image": image,
+    }
+
+
+def test_upload_recompressed_without_exif(user_client, published_category):
+    response = user_client.post(
+        reverse("blog:create_post"), post_data(published_category,
+                                               jpeg_upload())
+    )
+    assert response.status_code == 302
+    post = Post.objects.get()
+    with Image.open(post.image.path) as image:
+        assert image.size == (150, 200), (
+            "Убедитесь, что загруженное изображение повёрнуто по EXIF и "
+            "уменьшено до POST_IMAGE_MAX_SIDE."
+        )
+        assert not image.getexif(), (
+            "Убедитесь, что из загруженных изображений удаляется EXIF."
+        )
+
+
+def test_upload_over_limit_rejected(
+    settings, user_client, published_category
+):
+    settings.POST_IMAGE_MAX_UPLOAD_SIZE = 1024
+    response = user_client.post(
+        reverse("blog:create_post"),
+        post_data(published_category, jpeg_upload(size=(800, 800))),
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что файл больше POST_IMAGE_MAX_UPLOAD_SIZE отклоняется "
+        "с ошибкой в поле изображения."
+    )
+    assert not Post.objects.exists()
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [("POST_IMAGE_MAX_PIXELS", 1000), ("POST_IMAGE_FORMATS", ("PNG",))],
+)
+def test_header_checks(
+    settings, user_client, published_category, setting, value
+):
+    setattr(settings, setting, value)
+    response = user_client.post(
+        reverse("blog:create_post"),
+        post_data(published_category, jpeg_upload()),
+    )
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что разрешение и формат изображения проверяются по "
+        "заголовку файла."
+    )
+
+
+def test_not_an_image_rejected(user_client, published_category):
+    upload = SimpleUploadedFile("fake.jpg", b"not an image", "image/jpeg")
+    response = user_client.post(
+        reverse("blog:create_post"), post_data(published_category, upload)
+    )
+    assert "image" in response.context["form"].errors
+
+
+def png_upload(size=(400, 300), name="picture.png"):
+    buffer = BytesIO()
+    Image.effect_noise(size, 64).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/png")
+
+
+def test_truncated_image_rejected(user_client, published_category):
+    upload = png_upload()
+    upload = SimpleUploadedFile(
+        upload.name, upload.read()[:2000], upload.content_type
+    )
+    response = user_client.post(
+        reverse("blog:create_post"), post_data(published_category, upload)
+    )
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что обрезанное изображение отклоняется ошибкой формы, "
+        "а не ошибкой сервера."
+    )
+    assert not Post.objects.exists()
+
+
+def test_decoded_pixels_limited_without_draft(
+    settings, user_client, published_category
+):
+    settings.POST_IMAGE_MAX_DECODED_PIXELS = 1000
+    response = user_client.post(
+        reverse("blog:create_post"), post_data(published_category,
+                                               png_upload())
+    )
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что для PNG действует POST_IMAGE_MAX_DECODED_PIXELS."
+    )
+    response = user_client.post(
+        reverse("blog:create_post"),
+        post_data(published_category, jpeg_upload()),
+    )
+    assert response.status_code == 302, (
+        "Убедитесь, что JPEG уменьшается при декодировании и ограничен "
+        "только POST_IMAGE_MAX_PIXELS."
+    )
+
+
+def test_csrf_still_enforced(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    response = client.post(
+        reverse("blog:create_post"),
+        post_data(published_category, jpeg_upload()),
+    )
+    assert response.status_code == 403, (
+        "Убедитесь, что страница создания поста проверяет CSRF-токен."
+    )